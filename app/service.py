@@ -16,11 +16,13 @@ from modules.backlog.sqlmodels import (
     GameMetadataModel,
 )
 from modules.repositories.smol_sql_repository import SmolORMRepository
+from smolorm.sqlmodel import SqlModel
 
 STORAGE = "smol_orm"
 
 # Initialize repositories and services
 if STORAGE == "smol_orm":
+    SqlModel.migrate_all()
     backlog_repo = SmolORMRepository(GameBacklogModel, GameBacklog)
     entry_repo = SmolORMRepository(GameBacklogEntryModel, GameBacklogEntry)
     metadata_repo = SmolORMRepository(GameMetadataModel, GameMetadata)
@@ -29,7 +31,7 @@ else:
     backlog_repo = InMemoryRepository()
     entry_repo = InMemoryRepository()
     metadata_repo = InMemoryRepository()
-    session_repo = InMemoryRepository()
+    session_repo = InMemoryRepository(indexed_fields=("session_end",))
 
 backlog_service = GameBacklogService(
     backlog_repo=backlog_repo,
@@ -3,20 +3,20 @@ from app.service import backlog_service, play_session_service
 from libs.fmt.datetime_formatter import DateTimeFormatter
 
 
-@dataclass()
+@dataclass(slots=True)
 class PlaySessionData:
-    id = "0"
-    title = ""
-    start = ""
-    end = ""
-    playtime = ""
+    id: str = "0"
+    title: str = ""
+    start: str = ""
+    end: str = ""
+    playtime: str = ""
 
 
-@dataclass()
+@dataclass(slots=True)
 class PlayStatisticsData:
-    id = "0"
-    title = ""
-    playtime = ""
+    id: str = "0"
+    title: str = ""
+    playtime: str = ""
 
 
 class DataService:
@@ -0,0 +1,13 @@
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+import smolorm.connection
+
+# Tests run against a private in-memory database: no fsync per commit and
+# db.sqlite3 is left untouched. StaticPool keeps the one connection alive,
+# otherwise every checkout would open a fresh, empty database
+smolorm.connection.engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
@@ -1,33 +1,186 @@
-from functools import reduce
-from typing import Any
+import operator
+from functools import lru_cache, reduce
+from typing import Any, Callable
 
 from modules.repositories.abstract_repository import FilterOp, FilterQuery
 from smolorm.expressions import Expr, col
 
+Predicate = Callable[[Any], bool]
+
+
+def _ordered(compare: Callable[[Any, Any], bool]) -> Callable[[Any, Any], bool]:
+    # Cost ordering may run these before a filter that used to reject the row,
+    # so an unset value must fail the test rather than raise
+    return lambda actual, expected: actual is not None and compare(actual, expected)
+
+
+def _contains(actual: Any, expected: Any) -> bool:
+    return actual is not None and expected in actual
+
+
+def _icontains(actual: Any, needle: str) -> bool:
+    return needle in str(actual).lower()
+
+
+def _starts_with(actual: Any, prefix: str) -> bool:
+    return str(actual).startswith(prefix)
+
+
+def _istarts_with(actual: Any, prefix: str) -> bool:
+    return str(actual).lower().startswith(prefix)
+
+
+def _ends_with(actual: Any, suffix: str) -> bool:
+    return str(actual).endswith(suffix)
+
+
+def _iends_with(actual: Any, suffix: str) -> bool:
+    return str(actual).lower().endswith(suffix)
+
+
+def _in(actual: Any, expected: Any) -> bool:
+    return actual in expected
+
+
+def _not_in(actual: Any, expected: Any) -> bool:
+    return actual not in expected
+
+
+_COMPARATORS: dict[FilterOp, Callable[[Any, Any], bool]] = {
+    FilterOp.EQ: operator.eq,
+    FilterOp.NEQ: operator.ne,
+    FilterOp.LT: _ordered(operator.lt),
+    FilterOp.LTE: _ordered(operator.le),
+    FilterOp.GT: _ordered(operator.gt),
+    FilterOp.GTE: _ordered(operator.ge),
+    FilterOp.CONTAINS: _contains,
+    FilterOp.ICONTAINS: _icontains,
+    FilterOp.STARTS_WITH: _starts_with,
+    FilterOp.ISTARTS_WITH: _istarts_with,
+    FilterOp.ENDS_WITH: _ends_with,
+    FilterOp.IENDS_WITH: _iends_with,
+    FilterOp.IN: _in,
+    FilterOp.NOT_IN: _not_in,
+}
+
+
+def _lower(value: Any) -> str:
+    return str(value).lower()
+
+
+# String filters normalise their needle once at compile time, not once per row
+_PREPARE: dict[FilterOp, Callable[[Any], Any]] = {
+    FilterOp.ICONTAINS: _lower,
+    FilterOp.STARTS_WITH: str,
+    FilterOp.ISTARTS_WITH: _lower,
+    FilterOp.ENDS_WITH: str,
+    FilterOp.IENDS_WITH: _lower,
+}
+
+
+def _freeze(op: FilterOp, value: Any) -> Any:
+    # Membership tests read the same on a tuple, other comparisons may not
+    if op not in (FilterOp.IN, FilterOp.NOT_IN):
+        return value
+    if isinstance(value, list):
+        return tuple(value)
+    if isinstance(value, set):
+        return frozenset(value)
+    return value
+
+
+FiltersKey = tuple[tuple[str, FilterOp, type, Any], ...]
+
+
+def _key(filters: list[FilterQuery]) -> FiltersKey:
+    # 1, 1.0 and True compare equal but format differently, keep them apart
+    return tuple(
+        (f.column, f.op, type(f.value), _freeze(f.op, f.value)) for f in filters
+    )
+
+
+def _build_predicate(column: str, op: FilterOp, value: Any) -> Predicate:
+    compare = _COMPARATORS.get(op)
+    if compare is None:
+        raise ValueError(f"Unsupported filter operator: {op}")
+    prepare = _PREPARE.get(op)
+    if prepare is not None:
+        value = prepare(value)
+    return lambda entity: compare(getattr(entity, column, None), value)
 
-class FilterExpressionEvaluator:
-    @staticmethod
-    def evaluate(entity: Any, filters: list[FilterQuery]) -> bool:
-        for f in filters:
-            column = f.column
-            op = f.op
-            value = f.value
 
-            actual = getattr(entity, column, None)
+# Cheap comparisons run first so all() can short-circuit before string work
+_COST = {
+    FilterOp.EQ: 0,
+    FilterOp.NEQ: 0,
+    FilterOp.LT: 1,
+    FilterOp.LTE: 1,
+    FilterOp.GT: 1,
+    FilterOp.GTE: 1,
+    FilterOp.IN: 1,
+    FilterOp.NOT_IN: 1,
+    FilterOp.CONTAINS: 2,
+    FilterOp.STARTS_WITH: 2,
+    FilterOp.ENDS_WITH: 2,
+    FilterOp.ICONTAINS: 3,
+    FilterOp.ISTARTS_WITH: 3,
+    FilterOp.IENDS_WITH: 3,
+}
 
-            if not FilterExpressionEvaluator._compare(actual, value, op):
-                return False
-        return True
 
+def _build(key: FiltersKey) -> Predicate:
+    ordered = sorted(key, key=lambda f: _COST.get(f[1], 0))
+    predicates = [
+        _build_predicate(column, op, value) for column, op, _, value in ordered
+    ]
+    if not predicates:
+        return lambda entity: True
+    if len(predicates) == 1:
+        return predicates[0]
+    return lambda entity: all(predicate(entity) for predicate in predicates)
+
+
+_build_cached = lru_cache(maxsize=256)(_build)
+
+
+def _chain(key: FiltersKey) -> Expr:
+    filter_expressions: list[Any] = [
+        FilterExpressionEvaluator.filter_query_to_sql_query(
+            FilterQuery(column, op, value)
+        )
+        for column, op, _, value in key
+    ]
+
+    final_expression: Expr = reduce(lambda x, y: (x) & (y), filter_expressions)
+
+    return final_expression
+
+
+# Expressions are never mutated once built, so equal filter lists can share one
+_chain_cached = lru_cache(maxsize=256)(_chain)
+
+
+class FilterExpressionEvaluator:
     @staticmethod
-    def chain_filter_queries_to_sql_query(filters: list[FilterQuery]) -> Expr:
-        filter_expressions: list[Any] = [
-            FilterExpressionEvaluator.filter_query_to_sql_query(f) for f in filters
-        ]
+    def compile(filters: list[FilterQuery]) -> Predicate:
+        """Turn filters into a single entity -> bool predicate, built once per scan"""
+        try:
+            # Repeated predicates are dropped, they cannot change the outcome
+            return _build_cached(tuple(dict.fromkeys(_key(filters))))
+        except TypeError:  # unhashable filter value, build it uncached
+            return _build(_key(filters))
 
-        final_expression: Expr = reduce(lambda x, y: (x) & (y), filter_expressions)
+    @staticmethod
+    def evaluate(entity: Any, filters: list[FilterQuery]) -> bool:
+        return FilterExpressionEvaluator.compile(filters)(entity)
 
-        return final_expression
+    @staticmethod
+    def chain_filter_queries_to_sql_query(filters: list[FilterQuery]) -> Expr:
+        key = _key(filters)
+        try:
+            return _chain_cached(key)
+        except TypeError:  # unhashable filter value, build it uncached
+            return _chain(key)
 
     @staticmethod
     def filter_query_to_sql_query(filter: FilterQuery) -> Expr:
@@ -70,37 +223,3 @@ class FilterExpressionEvaluator:
                 return col(column) >= value
             case _:
                 raise ValueError(f"Unsupported operator: {op}")
-
-    @staticmethod
-    def _compare(actual: Any, expected: Any, op: FilterOp) -> bool:
-        match op:
-            case FilterOp.EQ:
-                return actual == expected
-            case FilterOp.NEQ:
-                return actual != expected
-            case FilterOp.LT:
-                return actual < expected
-            case FilterOp.LTE:
-                return actual <= expected
-            case FilterOp.GT:
-                return actual > expected
-            case FilterOp.GTE:
-                return actual >= expected
-            case FilterOp.CONTAINS:
-                return expected in actual
-            case FilterOp.ICONTAINS:
-                return str(expected).lower() in str(actual).lower()
-            case FilterOp.STARTS_WITH:
-                return str(actual).startswith(str(expected))
-            case FilterOp.ISTARTS_WITH:
-                return str(actual).lower().startswith(str(expected).lower())
-            case FilterOp.ENDS_WITH:
-                return str(actual).endswith(str(expected))
-            case FilterOp.IENDS_WITH:
-                return str(actual).lower().endswith(str(expected).lower())
-            case FilterOp.IN:
-                return actual in expected
-            case FilterOp.NOT_IN:
-                return actual not in expected
-            case _:
-                raise ValueError(f"Unsupported filter operator: {op}")
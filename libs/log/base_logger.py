@@ -10,9 +10,16 @@ class LogLevel(enum.Enum):
     CRITICAL = "CRITICAL"
 
 
+_SEVERITY = {level: rank for rank, level in enumerate(LogLevel)}
+
+
 class ILogger(ABC):
-    def __init__(self, name: str = "Logger"):
+    def __init__(self, name: str = "Logger", level: LogLevel = LogLevel.DEBUG):
         self.name = name
+        self.level = level
+
+    def is_enabled_for(self, level: LogLevel) -> bool:
+        return _SEVERITY[level] >= _SEVERITY[self.level]
 
     @abstractmethod
     def _get_timestamp(self) -> str:
@@ -23,17 +30,23 @@ class ILogger(ABC):
         """Log a message with the given level."""
         raise NotImplementedError("")
 
-    def debug(self, message: str) -> None:
-        self._log(LogLevel.DEBUG, message)
+    def log(self, level: LogLevel, message: str, *args: object) -> None:
+        """Log at level; %-style args are only formatted if the level is enabled."""
+        if not self.is_enabled_for(level):
+            return
+        self._log(level, message % args if args else message)
+
+    def debug(self, message: str, *args: object) -> None:
+        self.log(LogLevel.DEBUG, message, *args)
 
-    def info(self, message: str) -> None:
-        self._log(LogLevel.INFO, message)
+    def info(self, message: str, *args: object) -> None:
+        self.log(LogLevel.INFO, message, *args)
 
-    def warning(self, message: str) -> None:
-        self._log(LogLevel.WARNING, message)
+    def warning(self, message: str, *args: object) -> None:
+        self.log(LogLevel.WARNING, message, *args)
 
-    def error(self, message: str) -> None:
-        self._log(LogLevel.ERROR, message)
+    def error(self, message: str, *args: object) -> None:
+        self.log(LogLevel.ERROR, message, *args)
 
-    def critical(self, message: str) -> None:
-        self._log(LogLevel.CRITICAL, message)
+    def critical(self, message: str, *args: object) -> None:
+        self.log(LogLevel.CRITICAL, message, *args)
@@ -4,8 +4,13 @@ from datetime import datetime
 
 
 class FileLogger(ILogger):
-    def __init__(self, name: str = "FileLogger", filepath: str = "log.txt"):
-        super().__init__(name)
+    def __init__(
+        self,
+        name: str = "FileLogger",
+        filepath: str = "log.txt",
+        level: LogLevel = LogLevel.DEBUG,
+    ):
+        super().__init__(name, level)
         self.filepath = Path(filepath)
         self._create_file()
 
@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import Any, List, Optional
-from libs.log.base_logger import ILogger
+from libs.log.base_logger import ILogger, LogLevel
 from libs.log.file_logger import FileLogger
 from modules.backlog.models import (
     BacklogPriority,
@@ -25,7 +25,7 @@ class GameBacklogService:
         backlog_repo: IRepository[int, GameBacklog],
         entry_repo: IRepository[int, GameBacklogEntry],
         metadata_repo: IRepository[int, GameMetadata],
-        logger: ILogger = FileLogger("GameBacklogService"),
+        logger: ILogger = FileLogger("GameBacklogService", level=LogLevel.INFO),
     ):
         self.backlog_repo = backlog_repo
         self.entry_repo = entry_repo
@@ -40,15 +40,15 @@ class GameBacklogService:
         backlog = self.backlog_repo.create(
             GameBacklog(title=title, entries=entries or [])
         )
-        self.logger.info(f"Backlog {backlog} created successfully")
+        self.logger.info("Backlog %s created successfully", backlog)
         return backlog
 
     def get_backlog(self, backlog_id: int) -> Optional[GameBacklog]:
         backlog = self.backlog_repo.get_by_id(backlog_id)
         if not backlog:
-            self.logger.info(f"Backlog {backlog_id} not found")
+            self.logger.info("Backlog %s not found", backlog_id)
         else:
-            self.logger.info(f"Backlog {backlog} found")
+            self.logger.info("Backlog %s found", backlog)
         return backlog
 
     def search_backlogs(self, query: str) -> PaginatedResult[GameBacklog]:
@@ -56,23 +56,23 @@ class GameBacklogService:
             filters=[FilterQuery("title", FilterOp.ICONTAINS, query)]
         )
 
-        self.logger.info(f"Backlogs found: {result}")
+        self.logger.info("Backlogs found: %s", result)
         return result
 
     def list_all_backlogs(self) -> List[GameBacklog]:
         backlogs = self.backlog_repo.list_all()
-        self.logger.info(f"All backlogs found: {backlogs}")
+        self.logger.info("All backlogs found: %s", backlogs)
         return backlogs
 
     def update_backlog(self, backlog_id: int, fields: dict[str, Any]) -> GameBacklog:
         backlog = self.backlog_repo.update(backlog_id, fields)
-        self.logger.info(f"Backlog {backlog} updated successfully")
+        self.logger.info("Backlog %s updated successfully", backlog)
         return backlog
 
     def delete_backlog(self, backlog_id: int) -> bool:
         backlog = self.backlog_repo.get_by_id(backlog_id)
         if not backlog:
-            self.logger.info(f"Backlog {backlog_id} not found for deletion")
+            self.logger.info("Backlog %s not found for deletion", backlog_id)
             return False
         for entry_id in backlog.entries:
             self.entry_repo.delete(entry_id)
@@ -1,7 +1,8 @@
+from collections import defaultdict
 from math import fsum
 from datetime import datetime
 from typing import Optional
-from libs.log.base_logger import ILogger
+from libs.log.base_logger import ILogger, LogLevel
 from libs.log.file_logger import FileLogger
 from modules.exceptions.exceptions import ServiceError
 from modules.play_session.models import PlaySession
@@ -19,81 +20,141 @@ class PlaySessionService:
     def __init__(
         self,
         session_repository: IRepository[int, PlaySession],
-        logger: ILogger = FileLogger("PlaySessionService"),
+        logger: ILogger = FileLogger("PlaySessionService", level=LogLevel.INFO),
     ):
         self.session_repository = session_repository
         self.logger = logger
 
+        # Active session ids in start order, primed from the repository and
+        # trusted only while every write since went through this service: the
+        # repository's write count must still match. Shared storage (the CLI and
+        # the TUI both write db.sqlite3) has no write count and is always queried
+        self._active_session_ids: Optional[dict[int, None]] = None
+        self._synced_writes: Optional[int] = None
+        # Session ids per backlog entry, under the same sole-writer check
+        self._entry_session_ids: Optional[dict[int, list[int]]] = None
+
     # ===============================
     # PLAY SESSION TIMER OPERATIONS
     # ===============================
 
     def start_session(self, backlog_entry: int) -> PlaySession:
+        self._check_indexes()
         session = self.session_repository.create(
             PlaySession(session_start=datetime.now(), backlog_entry=backlog_entry)
         )
-        self.logger.debug(f"Start Play Session for backlog entry: {backlog_entry}")
+        if self._entry_session_ids is not None:
+            self._entry_session_ids.setdefault(backlog_entry, []).append(session.id)
+        if self._active_session_ids is not None:
+            self._active_session_ids[session.id] = None
+        self._synced_writes = self.session_repository.write_count
+        self.logger.debug("Start Play Session for backlog entry: %s", backlog_entry)
         return session
 
     def stop_session(self, session_id: Optional[int] = None) -> PlaySession:
         """
         Stops provided session, by default stops first active session
         """
-        session = None
-
-        if session_id:
-            session = self.session_repository.get_by_id(session_id)
-            self.logger.debug(f"Found session {session_id} to stop")
+        active_ids = self._get_active_session_ids()
 
-        else:
+        if not session_id:
             self.logger.debug("No play session provided, search first active session")
-            result = self.get_active_sessions()
 
-            if len(result) <= 0:
-                raise PlaySessionError(f"No active sessions: {result}")
+            if len(active_ids) <= 0:
+                raise PlaySessionError("No active sessions")
 
-            session = result[0]
+            session_id = next(iter(active_ids))
+
+        # Re-read the row even for indexed ids, another process may have ended it
+        session = self.session_repository.get_by_id(session_id)
 
         if session is None:
+            active_ids.pop(session_id, None)
             raise PlaySessionError(
                 f"Error while stopping session: Session {session_id} does not exist"
             )
 
         if not session.is_active:
+            active_ids.pop(session_id, None)
             raise PlaySessionError("Cannot stop an inactive play session")
 
-        session_id = session.id
+        self.logger.debug("Found session %s to stop", session_id)
 
-        now = datetime.now()
-
-        session.session_end = now
+        try:
+            session = self.session_repository.update(
+                session_id, {"session_end": datetime.now()}
+            )
+        except Exception:
+            self._active_session_ids = None  # re-read from storage next time
+            raise
 
-        session = self.session_repository.update(
-            session_id,
-            {
-                "session_start": session.session_start,
-                "session_end": session.session_end,
-            },
-        )
+        active_ids.pop(session_id, None)
+        self._synced_writes = self.session_repository.write_count
 
-        self.logger.debug(f"Stop Play Session {session_id}")
+        self.logger.debug("Stop Play Session %s", session_id)
         return session
 
-    def get_all_entry_sessions(self, backlog_entry: int) -> list[PlaySession]:
-        result = self.session_repository.filter(
-            filters=[FilterQuery("backlog_entry", FilterOp.EQ, backlog_entry)]
-        )
+    def stop_sessions(
+        self, session_ids: Optional[list[int]] = None
+    ) -> list[PlaySession]:
+        """
+        Stops provided sessions in a single update, by default stops all active sessions
+        """
+        active_ids = self._get_active_session_ids()
+
+        stop_all = session_ids is None
+        if session_ids is None:
+            session_ids = list(active_ids)
+
+        if not session_ids:
+            return []
+
+        # Re-read the rows, another service or process may have ended some
+        stored = self.session_repository.get_many_by_ids(session_ids)
+        still_active = {s.id for s in stored if s.is_active}
+        inactive_ids = [i for i in session_ids if i not in still_active]
+        for session_id in inactive_ids:
+            active_ids.pop(session_id, None)
+
+        if stop_all:
+            session_ids = [i for i in session_ids if i in still_active]
+            if not session_ids:
+                return []
+        elif inactive_ids:
+            raise PlaySessionError(
+                f"Cannot stop inactive or unknown play sessions: {inactive_ids}"
+            )
 
-        self.logger.debug(f"Get all play sessions for backlog entry {backlog_entry}")
-        return result.result
+        try:
+            sessions = self.session_repository.update_many(
+                session_ids, {"session_end": datetime.now()}
+            )
+        except Exception:
+            self._active_session_ids = None  # re-read from storage next time
+            raise
 
-    def get_max_playtime(self, backlog_entry: int) -> float:
-        result = self.session_repository.filter(
-            filters=[FilterQuery("backlog_entry", FilterOp.EQ, backlog_entry)]
-        )
+        for session_id in session_ids:
+            active_ids.pop(session_id, None)
+        self._synced_writes = self.session_repository.write_count
 
-        sessions = result.result
+        self.logger.debug("Stop Play Sessions %s", session_ids)
+        return sessions
 
+    def get_all_entry_sessions(self, backlog_entry: int) -> list[PlaySession]:
+        self.logger.debug("Get all play sessions for backlog entry %s", backlog_entry)
+        if self.session_repository.write_count is None:
+            result = self.session_repository.filter(
+                filters=[FilterQuery("backlog_entry", FilterOp.EQ, backlog_entry)]
+            )
+            return result.result
+
+        session_ids = self._get_entry_session_ids().get(backlog_entry)
+        if not session_ids:
+            return []
+        return self.session_repository.get_many_by_ids(session_ids)
+
+    def get_max_playtime(self, backlog_entry: int) -> float:
+        sessions = self.get_all_entry_sessions(backlog_entry)
         return fsum(s.time_played for s in sessions)
 
     def get_session(self, session_id: int) -> Optional[PlaySession]:
@@ -105,20 +166,51 @@ class PlaySessionService:
         return sessions
 
     def get_active_sessions(self) -> list[PlaySession]:
+        active_ids = list(self._get_active_session_ids())
+        if not active_ids:
+            return []
+        return self.session_repository.get_many_by_ids(active_ids)
+
+    def _get_entry_session_ids(self) -> dict[int, list[int]]:
+        self._check_indexes()
+        if self._entry_session_ids is not None:
+            return self._entry_session_ids
+
+        entry_session_ids: dict[int, list[int]] = defaultdict(list)
+        for session in self.session_repository.list_all():
+            entry_session_ids[session.backlog_entry].append(session.id)
+        if self._synced_writes is not None:
+            self._entry_session_ids = dict(entry_session_ids)
+        return dict(entry_session_ids)
+
+    def _check_indexes(self) -> None:
+        """Forget both indexes once something else has written to storage"""
+        writes = self.session_repository.write_count
+        if writes is None or writes != self._synced_writes:
+            self._active_session_ids = None
+            self._entry_session_ids = None
+        self._synced_writes = writes
+
+    def _get_active_session_ids(self) -> dict[int, None]:
+        self._check_indexes()
+        if self._active_session_ids is not None:
+            return self._active_session_ids
+
         result = self.session_repository.filter(
             filters=[FilterQuery("session_end", FilterOp.EQ, None)]
         )
-        return result.result
+        active_ids = dict.fromkeys(s.id for s in result.result)
+        if self._synced_writes is not None:
+            self._active_session_ids = active_ids
+        return active_ids
 
     def get_played_entries(self) -> set[int]:
-        return set(
-            [session.backlog_entry for session in self.session_repository.list_all()]
-        )
+        return set(self._get_entry_session_ids())
 
     def get_entries_with_playtime(self) -> dict[int, float]:
-        result = dict()
+        playtimes: dict[int, list[float]] = defaultdict(list)
 
-        for e in self.get_played_entries():
-            result[e] = self.get_max_playtime(e)
+        for session in self.session_repository.list_all():
+            playtimes[session.backlog_entry].append(session.time_played)
 
-        return result
+        return {entry: fsum(times) for entry, times in playtimes.items()}
@@ -2,7 +2,7 @@ from math import fsum
 import pytest
 from modules.play_session.models import PlaySession
 from modules.repositories.in_memory_repository import InMemoryRepository
-from modules.play_session.services import PlaySessionService
+from modules.play_session.services import PlaySessionError, PlaySessionService
 
 
 @pytest.fixture
@@ -77,6 +77,20 @@ def test_get_max_playtime(service):
     assert (time_played_1) == (time_played_2)
 
 
+def test_get_entries_with_playtime(service):
+    svc, _ = service
+
+    svc.stop_session(svc.start_session(1).id)
+    svc.stop_session(svc.start_session(1).id)
+    svc.stop_session(svc.start_session(2).id)
+
+    playtimes = svc.get_entries_with_playtime()
+
+    assert set(playtimes) == {1, 2}
+    assert playtimes[1] == svc.get_max_playtime(1)
+    assert playtimes[2] == svc.get_max_playtime(2)
+
+
 def test_stop_session(service):
     svc, _ = service
 
@@ -90,6 +104,15 @@ def test_stop_session(service):
     assert s2.is_active is False
 
 
+def test_cannot_stop_session_twice(service):
+    svc, _ = service
+
+    s1 = svc.stop_session(svc.start_session(1).id)
+
+    with pytest.raises(PlaySessionError):
+        svc.stop_session(s1.id)
+
+
 def test_get_active_sessions(service):
     svc, _ = service
 
@@ -123,6 +146,154 @@ def test_stop_first_active_session_by_default(service):
     assert s_.is_active is False
 
 
+def test_stop_sessions_stops_all_active_by_default(service):
+    svc, _ = service
+
+    s1 = svc.start_session(1)
+    s2 = svc.start_session(2)
+    svc.stop_session(svc.start_session(3).id)
+
+    stopped = svc.stop_sessions()
+
+    assert [s.id for s in stopped] == [s1.id, s2.id]
+    assert all(not s.is_active for s in stopped)
+    assert svc.get_active_sessions() == []
+
+
+def test_stop_sessions_rejects_inactive_sessions(service):
+    svc, _ = service
+
+    s1 = svc.start_session(1)
+    s2 = svc.stop_session(svc.start_session(2).id)
+
+    with pytest.raises(PlaySessionError):
+        svc.stop_sessions([s1.id, s2.id])
+
+    assert svc.get_session(s1.id).is_active
+
+
+def test_active_sessions_survive_service_restart(service):
+    svc, session_repo = service
+
+    s1 = svc.start_session(1)
+    svc.stop_session(svc.start_session(2).id)
+
+    restarted = PlaySessionService(session_repo)
+
+    assert [s.id for s in restarted.get_active_sessions()] == [s1.id]
+    assert restarted.stop_session().id == s1.id
+    assert restarted.get_active_sessions() == []
+
+
+class SharedRepository(InMemoryRepository[int, PlaySession]):
+    # Stands in for db.sqlite3, which the CLI and the TUI write concurrently
+    write_count = None
+
+
+def test_shared_storage_sees_sessions_of_other_processes():
+    session_repo = SharedRepository()
+    cli, tui = PlaySessionService(session_repo), PlaySessionService(session_repo)
+
+    assert cli.get_active_sessions() == []
+
+    s1 = tui.start_session(1)
+    assert [s.id for s in cli.get_active_sessions()] == [s1.id]
+
+    tui.stop_session(s1.id)
+    assert cli.get_active_sessions() == []
+    with pytest.raises(PlaySessionError):
+        cli.stop_session()
+
+
+def test_stop_session_rejects_session_ended_elsewhere(service):
+    svc, session_repo = service
+
+    s1 = svc.start_session(1)
+    assert [s.id for s in svc.get_active_sessions()] == [s1.id]
+    ended = PlaySessionService(session_repo).stop_session(s1.id).session_end
+
+    with pytest.raises(PlaySessionError, match="inactive"):
+        svc.stop_session(s1.id)
+    assert session_repo.get_by_id(s1.id).session_end == ended
+
+
+def test_active_sessions_follow_writes_of_other_services(service):
+    svc, session_repo = service
+    other = PlaySessionService(session_repo)
+
+    s1 = svc.start_session(1)
+    assert [s.id for s in svc.get_active_sessions()] == [s1.id]
+
+    other.stop_session(s1.id)
+    s2 = other.start_session(2)
+
+    assert [s.id for s in svc.get_active_sessions()] == [s2.id]
+    assert svc.stop_session().id == s2.id
+    assert svc.get_active_sessions() == []
+
+
+def test_played_entries_follow_writes_of_other_services(service):
+    svc, session_repo = service
+    other = PlaySessionService(session_repo)
+
+    svc.stop_session(svc.start_session(1).id)
+    assert svc.get_played_entries() == {1}
+
+    s2 = other.stop_session(other.start_session(2).id)
+
+    assert svc.get_played_entries() == {1, 2}
+    assert [s.id for s in svc.get_all_entry_sessions(2)] == [s2.id]
+    assert svc.get_max_playtime(2) == s2.time_played
+
+
+def test_stop_sessions_leaves_sessions_ended_elsewhere(service):
+    svc, session_repo = service
+
+    s1 = svc.start_session(1)
+    s2 = svc.start_session(2)
+    assert [s.id for s in svc.get_active_sessions()] == [s1.id, s2.id]
+    ended = PlaySessionService(session_repo).stop_session(s1.id).session_end
+
+    with pytest.raises(PlaySessionError, match="inactive"):
+        svc.stop_sessions([s1.id, s2.id])
+    assert session_repo.get_by_id(s1.id).session_end == ended
+    assert session_repo.get_by_id(s2.id).is_active
+
+    assert [s.id for s in svc.stop_sessions()] == [s2.id]
+    assert session_repo.get_by_id(s1.id).session_end == ended
+
+
+def test_shared_storage_sees_playtime_of_other_processes():
+    session_repo = SharedRepository()
+    cli, tui = PlaySessionService(session_repo), PlaySessionService(session_repo)
+
+    cli.stop_session(cli.start_session(1).id)
+    assert cli.get_played_entries() == {1}
+
+    s2 = tui.stop_session(tui.start_session(2).id)
+    tui.stop_session(tui.start_session(1).id)
+
+    assert cli.get_played_entries() == {1, 2}
+    assert [s.id for s in cli.get_all_entry_sessions(2)] == [s2.id]
+    assert len(cli.get_all_entry_sessions(1)) == 2
+    assert cli.get_max_playtime(2) == s2.time_played
+
+
+def test_failed_stop_does_not_keep_session_active(service):
+    svc, session_repo = service
+
+    s1 = svc.start_session(1)
+    svc.get_active_sessions()
+    session_repo.delete(s1.id, soft=False)
+
+    with pytest.raises(Exception):
+        svc.stop_session(s1.id)
+
+    assert svc.get_active_sessions() == []
+    with pytest.raises(PlaySessionError, match="No active sessions"):
+        svc.stop_session()
+
+
 def test_cannot_start_session_if_already_active(service):
     pass
     svc, _ = service
@@ -26,7 +26,7 @@ class FilterOp(Enum):
     IENDS_WITH = "IENDS_WITH"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class FilterQuery:
     column: str
     op: FilterOp
@@ -41,14 +41,30 @@ class PaginatedResult(BaseModel, Generic[T]):
 
 
 class IRepository(ABC, Generic[ID, T]):
+    @property
+    def write_count(self) -> Optional[int]:
+        """
+        Number of writes made to the storage so far, or None when writers this
+        process cannot see (another process on the same database) may change it
+        """
+        return None
+
     @abstractmethod
     def create(self, entity: T) -> T:
         raise NotImplementedError()
 
+    @abstractmethod
+    def create_many(self, entities: list[T]) -> list[T]:
+        raise NotImplementedError()
+
     @abstractmethod
     def update(self, entity_id: ID, patch: dict[str, Any]) -> T:
         raise NotImplementedError()
 
+    @abstractmethod
+    def update_many(self, entity_ids: list[ID], patch: dict[str, Any]) -> list[T]:
+        raise NotImplementedError()
+
     @abstractmethod
     def delete(self, entity_id: ID, soft: bool = True) -> bool:
         raise NotImplementedError()
@@ -1,13 +1,20 @@
+import heapq
+from bisect import bisect_left
+from collections import OrderedDict
 from contextlib import contextmanager
-from datetime import datetime
-from typing import Any, Generic, Optional, TypeVar, cast
+from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import dropwhile, islice
+from operator import attrgetter
+from typing import Any, Generic, Iterable, Iterator, Optional, TypeVar, cast
 
 from pydantic import BaseModel
 
 from libs.filter.filter_expression_evaluator import FilterExpressionEvaluator
-from libs.log.base_logger import ILogger
+from libs.log.base_logger import ILogger, LogLevel
 from libs.log.file_logger import FileLogger
 from modules.repositories.abstract_repository import (
+    FilterOp,
     FilterQuery,
     IRepository,
     PaginatedResult,
@@ -16,12 +23,18 @@ from modules.repositories.abstract_repository import (
 T = TypeVar("T", bound=BaseModel)
 ID = TypeVar("ID", bound=int)
 
+_sort_key = lru_cache(maxsize=64)(attrgetter)
+
+_FILTER_CACHE_SIZE = 128
+
 
 class InMemoryRepositoryValueException(Exception):
     def __init__(
         self,
         message: str,
-        logger: ILogger = FileLogger("InMemoryRepository", "test_logs.txt"),
+        logger: ILogger = FileLogger(
+            "InMemoryRepository", "test_logs.txt", level=LogLevel.INFO
+        ),
     ):
         self.message = message
         logger.error(message)
@@ -29,79 +42,269 @@ class InMemoryRepositoryValueException(Exception):
 
 class InMemoryRepository(Generic[ID, T], IRepository[ID, T]):
     def __init__(
-        self, logger: ILogger = FileLogger("InMemoryRepository", "test_logs.txt")
+        self,
+        logger: ILogger = FileLogger(
+            "InMemoryRepository", "test_logs.txt", level=LogLevel.INFO
+        ),
+        indexed_fields: tuple[str, ...] = (),
     ):
         self._store: dict[ID, T] = {}
         self._next_id: ID = cast(ID, 1)
         self._logger = logger
+        self._last_stamp = datetime.min
+        # field -> value -> ids, so EQ filters on these fields skip the full scan
+        self._indexes: dict[str, dict[Any, set[ID]]] = {
+            field: {} for field in indexed_fields
+        }
+        # (filters, order_by, descending) -> sorted matches, dropped on any write
+        self._filter_cache: OrderedDict[tuple, tuple[T, ...]] = OrderedDict()
+        self._writes = 0
 
-    def _assign_id_and_timestamps(self, entity: T, is_new: bool = True) -> T:
+    def _index(self, entity_id: ID, entity: T) -> None:
+        for field, index in self._indexes.items():
+            index.setdefault(getattr(entity, field, None), set()).add(entity_id)
+
+    def _unindex(self, entity_id: ID, entity: T) -> None:
+        for field, index in self._indexes.items():
+            value = getattr(entity, field, None)
+            ids = index.get(value)
+            if ids is not None:
+                ids.discard(entity_id)
+                if not ids:
+                    del index[value]
+
+    def _now(self) -> datetime:
+        """Strictly increasing write timestamps, even within one clock tick"""
         now = datetime.now()
+        if now <= self._last_stamp:
+            now = self._last_stamp + timedelta(microseconds=1)
+        self._last_stamp = now
+        return now
+
+    @property
+    def write_count(self) -> int:
+        return self._writes
+
+    def _changed(self) -> None:
+        self._filter_cache.clear()
+        self._writes += 1
+
+    def _put(self, entity_id: ID, entity: T) -> None:
+        self._changed()
+        previous = self._store.get(entity_id)
+        if previous is not None:
+            self._unindex(entity_id, previous)
+        self._store[entity_id] = entity
+        self._index(entity_id, entity)
+
+    def _indexed_ids(
+        self, filters: list[FilterQuery]
+    ) -> tuple[Optional[set[ID]], list[FilterQuery]]:
+        """Intersect the index hits of EQ/IN filters, returning the rest unapplied"""
+        candidate_ids: Optional[set[ID]] = None
+        residual = []
+        for f in filters:
+            index = self._indexes.get(f.column)
+            if index is None or f.op not in (FilterOp.EQ, FilterOp.IN):
+                residual.append(f)
+                continue
+            try:
+                if f.op == FilterOp.EQ:
+                    ids = index.get(f.value, set())
+                else:
+                    ids = set().union(*(index.get(v, ()) for v in f.value))
+            except TypeError:  # unhashable value, leave it to the evaluator
+                residual.append(f)
+                continue
+            candidate_ids = ids if candidate_ids is None else candidate_ids & ids
+        return candidate_ids, residual
+
+    def _candidates(
+        self, filters: list[FilterQuery]
+    ) -> tuple[Iterable[T], list[FilterQuery]]:
+        """Narrow the scan with indexed EQ/IN filters, returning the rest unapplied"""
+        candidate_ids, residual = self._indexed_ids(filters)
+        if candidate_ids is None:
+            return self._store.values(), residual
+        return [self._store[entity_id] for entity_id in sorted(candidate_ids)], residual
+
+    def _filter_iter(self, filters: list[FilterQuery]) -> Iterator[T]:
+        """Lazily yield matching entities in id order"""
+        candidates, residual = self._candidates(filters)
+        match = FilterExpressionEvaluator.compile(residual)
+        return (e for e in candidates if match(e))
+
+    def _stream_page(
+        self,
+        filters: list[FilterQuery],
+        limit: int,
+        offset: Optional[int],
+        cursor: Optional[Any],
+    ) -> tuple[list[T], int]:
+        """Slice an unordered page off the stream, counting the rest as it drains"""
+        items = self._filter_iter(filters)
+        if cursor is not None:
+            items = dropwhile(lambda e: getattr(e, "id") != cursor, items)
+            next(items, None)
+        page = list(islice(items, (offset or 0) + limit + 1))
+        return page, len(page) + sum(1 for _ in items)
+
+    @staticmethod
+    def _signature(
+        filters: list[FilterQuery],
+        order_by: Optional[str] = None,
+        descending: bool = False,
+    ) -> Optional[tuple]:
+        # FilterQuery compares values with ==, so 1, 1.0 and True would collide
+        frozen = tuple((f.column, f.op, type(f.value), f.value) for f in filters)
+        signature = (frozen, order_by, descending and order_by is not None)
+        try:
+            hash(signature)
+        except TypeError:  # unhashable filter value, skip the cache
+            return None
+        return signature
+
+    def _cached_matches(self, signature: Optional[tuple]) -> Optional[tuple[T, ...]]:
+        if signature is None:
+            return None
+        matches = self._filter_cache.get(signature)
+        if matches is not None:
+            self._filter_cache.move_to_end(signature)
+        return matches
+
+    def _cache_matches(self, signature: Optional[tuple], matches: Iterable[T]) -> None:
+        if signature is None:
+            return
+        self._filter_cache[signature] = tuple(matches)
+        if len(self._filter_cache) > _FILTER_CACHE_SIZE:
+            self._filter_cache.popitem(last=False)
+
+    def _assign_id_and_timestamps(self, entity: T, is_new: bool = True) -> T:
+        now = self._now()
         update_fields = {
             "id": self._next_id if is_new else getattr(entity, "id", None),
             "created_at": now if is_new else getattr(entity, "created_at", None),
             "updated_at": now,
         }
-        self._logger.debug(f"Assigning id and timestamps: {update_fields}")
+        self._logger.debug("Assigning id and timestamps: %s", update_fields)
         return entity.model_copy(update=update_fields)
 
     def create(self, entity: T) -> T:
         entity = self._assign_id_and_timestamps(entity)
-        self._store[self._next_id] = entity
+        self._put(self._next_id, entity)
         self._next_id = cast(ID, self._next_id + 1)
-        self._logger.debug(f"Created entity: {entity}")
+        self._logger.debug("Created entity: %s", entity)
         return entity
 
+    def create_many(self, entities: list[T]) -> list[T]:
+        now = self._now()  # one write, one stamp for the whole batch
+        created = []
+        for entity in entities:
+            entity = entity.model_copy(
+                update={"id": self._next_id, "created_at": now, "updated_at": now}
+            )
+            self._put(self._next_id, entity)
+            self._next_id = cast(ID, self._next_id + 1)
+            created.append(entity)
+        self._logger.debug("Created entities: %s", created)
+        return created
+
     def update(self, entity_id: ID, patch: dict[str, Any]) -> T:
         existing = self._store.get(entity_id)
         if not existing:
             raise InMemoryRepositoryValueException(
                 f"Entity with id {entity_id} not found."
             )
-        patch["updated_at"] = datetime.now()
+        patch["updated_at"] = self._now()
         updated = existing.model_copy(update=patch)
-        self._store[entity_id] = updated
-        self._logger.debug(f"Updated entity: {updated}")
+        self._put(entity_id, updated)
+        self._logger.debug("Updated entity: %s", updated)
+        return updated
+
+    def update_many(self, entity_ids: list[ID], patch: dict[str, Any]) -> list[T]:
+        entity_ids = list(dict.fromkeys(entity_ids))
+        missing = [
+            entity_id for entity_id in entity_ids if entity_id not in self._store
+        ]
+        if missing:
+            raise InMemoryRepositoryValueException(
+                f"Entities with ids {missing} not found."
+            )
+        patch = {**patch, "updated_at": self._now()}
+        updated = []
+        for entity_id in entity_ids:
+            entity = self._store[entity_id].model_copy(update=patch)
+            self._put(entity_id, entity)
+            updated.append(entity)
+        self._logger.debug("Updated entities: %s", updated)
         return updated
 
     def delete(self, entity_id: ID, soft: bool = False) -> bool:
         entity = self._store.get(entity_id)
         if not entity:
-            self._logger.debug(f"Cannot delete: entity with id {entity_id} not found.")
+            self._logger.debug("Cannot delete: entity with id %s not found.", entity_id)
             return False
         if soft:
             self._logger.debug("Enable soft deletion")
-            entity = entity.model_copy(update={"deleted_at": datetime.now()})
-            self._store[entity_id] = entity
+            entity = entity.model_copy(update={"deleted_at": self._now()})
+            self._put(entity_id, entity)
         else:
+            self._changed()
+            self._unindex(entity_id, entity)
             del self._store[entity_id]
-        self._logger.debug(f"Successful deleted entity: {entity}")
+        self._logger.debug("Successful deleted entity: %s", entity)
         return True
 
     def get_by_id(self, entity_id: ID, include_relations: bool = False) -> Optional[T]:
-        self._logger.debug(f"Get entity with id: {entity_id}")
+        self._logger.debug("Get entity with id: %s", entity_id)
         return self._store.get(entity_id)
 
     def get_many_by_ids(
         self, entity_ids: list[ID], include_relations: bool = False
     ) -> list[T]:
-        self._logger.debug(f"Get all entities with ids: {entity_ids}")
-        return [entity for id_, entity in self._store.items() if id_ in entity_ids]
+        self._logger.debug("Get all entities with ids: %s", entity_ids)
+        # Look ids up directly, sorted so results keep store (id) order
+        return [
+            self._store[entity_id]
+            for entity_id in sorted(set(entity_ids))
+            if entity_id in self._store
+        ]
 
     def list_all(self) -> list[T]:
         self._logger.debug("Get all entities")
         return list(self._store.values())
 
     def exists(self, filters: list[FilterQuery]) -> bool:
-        self._logger.debug(f"Check existence of entities with filters: {filters}")
-        return any(self._match_filters(e, filters) for e in self._store.values())
+        self._logger.debug("Check existence of entities with filters: %s", filters)
+        if not filters:
+            return bool(self._store)
+        candidate_ids, residual = self._indexed_ids(filters)
+        if candidate_ids is None:
+            candidates: Iterable[T] = self._store.values()
+        elif not residual:
+            return bool(candidate_ids)
+        else:
+            candidates = (self._store[entity_id] for entity_id in candidate_ids)
+        cached = self._cached_matches(self._signature(filters))
+        if cached is not None:
+            return bool(cached)
+        match = FilterExpressionEvaluator.compile(residual)
+        return any(match(e) for e in candidates)
 
     def count(self, filters: list[FilterQuery]) -> int:
-        self._logger.debug(f"Count entities with filters: {filters}")
-        return sum(1 for e in self._store.values() if self._match_filters(e, filters))
-
-    def _match_filters(self, entity: T, filters: list[FilterQuery]) -> bool:
-        return FilterExpressionEvaluator.evaluate(entity, filters)
+        self._logger.debug("Count entities with filters: %s", filters)
+        if not filters:
+            return len(self._store)
+        candidate_ids, residual = self._indexed_ids(filters)
+        if candidate_ids is not None and not residual:
+            return len(candidate_ids)
+        signature = self._signature(filters)
+        matches = self._cached_matches(signature)
+        if matches is None:
+            # Keep the matches, a page request for the same filters usually follows
+            matches = tuple(self._filter_iter(filters))
+            self._cache_matches(signature, matches)
+        return len(matches)
 
     def filter(
         self,
@@ -113,28 +316,64 @@ class InMemoryRepository(Generic[ID, T], IRepository[ID, T]):
         cursor: Optional[Any] = None,
         distinct: bool = False,
     ) -> PaginatedResult[T]:
-        items = [e for e in self._store.values() if self._match_filters(e, filters)]
-
-        if order_by:
-            items = [
-                e for e in items if getattr(e, order_by, None) is not None
-            ]  # remove unsortables
-            items.sort(
-                key=lambda x: getattr(x, order_by),
-                reverse=descending,  # type: ignore
-            )
+        signature = self._signature(filters, order_by, descending)
+        cached = self._cached_matches(signature)
+
+        top_k = None
+        if cached is not None:
+            items = list(cached)
+        else:
+            if order_by is None and limit is not None:
+                items, total = self._stream_page(filters, limit, offset, cursor)
+                return self._paginate(items, total, limit, offset)
+
+            candidates, residual = self._candidates(filters)
+            if order_by:
+                # Drop unsortables in the same pass as the filters
+                residual = [*residual, FilterQuery(order_by, FilterOp.NEQ, None)]
+            match = FilterExpressionEvaluator.compile(residual)
+            items = [e for e in candidates if match(e)]
+
+            # Without a cursor a page only needs the top offset + limit + 1 items,
+            # a heap beats the full sort while that is a small share of the matches
+            if limit is not None and cursor is None:
+                top_k = (offset or 0) + limit + 1
+                if top_k >= len(items) // 2:
+                    top_k = None
+
+            if top_k is None:
+                if order_by:
+                    items.sort(key=_sort_key(order_by), reverse=descending)
+                self._cache_matches(signature, items)
 
         if cursor is not None:
-            try:
+            get_id = attrgetter("id")
+            if isinstance(cursor, int) and (
+                order_by is None or (order_by == "id" and not descending)
+            ):
+                # Items are in ascending id order here, so bisect for the cursor
+                cursor_index = bisect_left(items, cursor, key=get_id)
+                found = (
+                    cursor_index < len(items) and get_id(items[cursor_index]) == cursor
+                )
+            else:
                 cursor_index = next(
-                    i for i, e in enumerate(items) if getattr(e, "id", None) == cursor
+                    (i for i, e in enumerate(items) if get_id(e) == cursor), -1
                 )
-                items = items[cursor_index + 1 :]
-            except StopIteration:
-                items = []
+                found = cursor_index != -1
+            items = items[cursor_index + 1 :] if found else []
 
         total = len(items)
 
+        if order_by and top_k is not None:
+            pick = heapq.nlargest if descending else heapq.nsmallest
+            items = pick(top_k, items, key=_sort_key(order_by))
+
+        return self._paginate(items, total, limit, offset)
+
+    def _paginate(
+        self, items: list[T], total: int, limit: Optional[int], offset: Optional[int]
+    ) -> PaginatedResult[T]:
         if offset:
             items = items[offset:]
 
@@ -147,11 +386,26 @@ class InMemoryRepository(Generic[ID, T], IRepository[ID, T]):
             if has_next:
                 next_cursor = str(getattr(items[-1], "id"))
 
-        self._logger.debug(f"Filtered entities: {items}")
+        self._logger.debug("Filtered entities: %s", items)
         return PaginatedResult(
             result=items, total=total, has_next=has_next, next_cursor=next_cursor
         )
 
     @contextmanager
     def atomic(self):
-        yield
+        # Writes replace entities rather than mutate them, so a shallow copy of
+        # the store is a full snapshot; indexes are rebuilt only on rollback
+        store = dict(self._store)
+        next_id = self._next_id
+        try:
+            yield
+        except BaseException:
+            self._store = store
+            self._next_id = next_id
+            self._changed()
+            for index in self._indexes.values():
+                index.clear()
+            for entity_id, entity in store.items():
+                self._index(entity_id, entity)
+            self._logger.debug("Rolled back to %s entities", len(store))
+            raise
@@ -1,20 +1,34 @@
 from contextlib import contextmanager
 from datetime import datetime
 from enum import Enum
+from functools import reduce
 import json
-from typing import Any, Generic, Optional, TypeVar, cast
+from types import UnionType
+from typing import (
+    Any,
+    Callable,
+    Generic,
+    Optional,
+    TypeVar,
+    Union,
+    get_args,
+    get_origin,
+)
 
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 
 from libs.filter.filter_expression_evaluator import FilterExpressionEvaluator
-from libs.log.base_logger import ILogger
+from libs.log.base_logger import ILogger, LogLevel
 from libs.log.file_logger import FileLogger
 from modules.repositories.abstract_repository import (
+    FilterOp,
     FilterQuery,
     IRepository,
     PaginatedResult,
 )
-from smolorm.expressions import col
+from smolorm.connection import session
+from smolorm.expressions import Expr, col
+from smolorm.orm import ORM
 from smolorm.sqlmodel import SqlModel
 
 T = TypeVar("T", bound=BaseModel)  # Domain type must be a Pydantic model
@@ -22,26 +36,77 @@ SQL = TypeVar("SQL", bound=SqlModel)  # Domain type must be a Pydantic model
 ID = TypeVar("ID", bound=int)
 
 
-def serialize(entity: dict[str, Any]) -> dict[str, Any]:
-    for key, val in entity.items():
-        if isinstance(val, list):
-            entity[key] = json.dumps(entity[key])
-        if isinstance(val, datetime):
-            entity[key] = val.isoformat()
-        if isinstance(val, Enum):
-            entity[key] = val.value
+FieldPlan = list[tuple[str, Callable[[Any], Any]]]
+
+
+def _field_type(annotation: Any) -> Any:
+    """Strip Optional[...] from an annotation"""
+    if get_origin(annotation) in (Union, UnionType):
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return annotation
+
+
+def _dump_list(value: list[Any]) -> str:
+    return json.dumps([v.value if isinstance(v, Enum) else v for v in value])
+
+
+def _dump_enum(value: Any) -> Any:
+    # Patches may carry the raw value ("inbox") rather than the member
+    return value.value if isinstance(value, Enum) else value
+
+
+def _dump_datetime(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _enum_loader(enum_cls: type[Enum]) -> Callable[[Any], Any]:
+    # SQLite hands int-valued enums back as text, look members up by str(value)
+    members = {str(member.value): member for member in enum_cls}
+    return lambda value: members.get(str(value), value)
+
+
+def build_serialize_plan(model: type[BaseModel]) -> FieldPlan:
+    plan: FieldPlan = []
+    for name, info in model.model_fields.items():
+        field_type = _field_type(info.annotation)
+        if get_origin(field_type) is list or field_type is list:
+            plan.append((name, _dump_list))
+        elif field_type is datetime:
+            plan.append((name, _dump_datetime))
+        elif isinstance(field_type, type) and issubclass(field_type, Enum):
+            plan.append((name, _dump_enum))
+    return plan
+
+
+def build_deserialize_plan(model: type[BaseModel]) -> FieldPlan:
+    plan: FieldPlan = []
+    for name, info in model.model_fields.items():
+        field_type = _field_type(info.annotation)
+        if get_origin(field_type) is list or field_type is list:
+            plan.append((name, json.loads))
+        elif isinstance(field_type, type) and issubclass(field_type, Enum):
+            plan.append((name, _enum_loader(field_type)))
+        elif field_type is int:
+            plan.append((name, int))
+    return plan
+
+
+def serialize(entity: dict[str, Any], plan: FieldPlan) -> dict[str, Any]:
+    for key, encode in plan:
+        val = entity.get(key)
+        if val is not None:
+            entity[key] = encode(val)
 
     return entity
 
 
-def deserialize(entity: dict[str, Any]) -> dict[str, Any]:
-    for key, val in entity.items():
-        if isinstance(val, str) and val.startswith("[") and val.endswith("]"):
-            entity[key] = json.loads(entity[key])
-        if isinstance(val, str) and val.endswith("Z"):
-            entity[key] = datetime.fromisoformat(val)
-        if isinstance(val, str) and val.isnumeric():
-            entity[key] = int(val)
+def deserialize(entity: dict[str, Any], plan: FieldPlan) -> dict[str, Any]:
+    for key, decode in plan:
+        val = entity.get(key)
+        if isinstance(val, str):
+            entity[key] = decode(val)
 
     return entity
 
@@ -50,7 +115,9 @@ class SmolORMRepositoryValueException(Exception):
     def __init__(
         self,
         message: str,
-        logger: ILogger = FileLogger("SmolORMRepository", "test_logs.txt"),
+        logger: ILogger = FileLogger(
+            "SmolORMRepository", "test_logs.txt", level=LogLevel.INFO
+        ),
     ):
         self.message = message
         logger.error(message)
@@ -61,43 +128,55 @@ class SmolORMRepository(Generic[ID, T], IRepository[ID, T]):
         self,
         model: type[SqlModel],
         pydantic_model: type[T],
-        logger: ILogger = FileLogger("SmolORMRepository", "test_logs.txt"),
+        logger: ILogger = FileLogger(
+            "SmolORMRepository", "test_logs.txt", level=LogLevel.INFO
+        ),
     ):
-        self._store: dict[ID, T] = {}
-        self._next_id: ID = cast(ID, 1)
         self._logger = logger
         self._model = model
         self._pydantic_model = pydantic_model
-
-    def _assign_timestamps(self, entity: T, is_new: bool = True) -> T:
-        now = datetime.now()
-        update_fields = {
-            "created_at": now if is_new else getattr(entity, "created_at", None),
-            "updated_at": now,
-        }
-        self._logger.debug(f"Assigning id and timestamps: {update_fields}")
-        return entity.model_copy(update=update_fields)
+        self._list_adapter = TypeAdapter(list[pydantic_model])
+        self._serialize_plan = build_serialize_plan(pydantic_model)
+        self._deserialize_plan = build_deserialize_plan(pydantic_model)
+
+    def _validate_many(self, rows: list[Any]) -> list[T]:
+        """Validate a whole result set in one call instead of one per row"""
+        return self._list_adapter.validate_python(
+            [deserialize(x, self._deserialize_plan) for x in rows]
+        )
 
     def create(self, entity: T) -> T:
-        entity = self._assign_timestamps(entity)
-        _entity = entity.model_dump()
-
-        del _entity["id"]
+        # Stamp the dump directly, no need for an intermediate model copy since
+        # the row read back is validated anyway
+        _entity = entity.model_dump(exclude={"id"})
+        _entity["created_at"] = _entity["updated_at"] = datetime.now()
 
-        _entity = serialize(_entity)
-        self._logger.debug(f"Created entity: {_entity}")
+        _entity = serialize(_entity, self._serialize_plan)
+        self._logger.debug("Created entity: %s", _entity)
         result = self._model.create(_entity)
 
         if not isinstance(result, dict):
             print(result)
             raise ValueError("Result is not a dictionary")
 
-        result = deserialize(result)
+        result = deserialize(result, self._deserialize_plan)
         return entity.model_validate(result)
 
+    def create_many(self, entities: list[T]) -> list[T]:
+        now = datetime.now()  # one write, one stamp for the whole batch
+        rows = []
+        for entity in entities:
+            row = entity.model_dump(exclude={"id"})
+            row["created_at"] = row["updated_at"] = now
+            rows.append(serialize(row, self._serialize_plan))
+
+        created = self._validate_many(self._model.create_many(rows))
+        self._logger.debug("Created entities: %s", created)
+        return created
+
     def update(self, entity_id: ID, patch: dict[str, Any]) -> T:
         patch["updated_at"] = datetime.now()
-        patch = serialize(patch)
+        patch = serialize(patch, self._serialize_plan)
         result = self._model.update(patch).where(col("id") == entity_id).run()
 
         if not isinstance(result, list):
@@ -113,23 +192,35 @@ class SmolORMRepository(Generic[ID, T], IRepository[ID, T]):
             print(result)
             raise ValueError("Result is not a dictionary")
 
-        entity = deserialize(entity)
+        entity = deserialize(entity, self._deserialize_plan)
         updated = self._pydantic_model.model_validate(entity)
 
-        self._logger.debug(f"Updated entity: {updated}")
+        self._logger.debug("Updated entity: %s", updated)
+        return updated
+
+    def update_many(self, entity_ids: list[ID], patch: dict[str, Any]) -> list[T]:
+        patch = serialize({**patch, "updated_at": datetime.now()}, self._serialize_plan)
+        result = self._model.update(patch).where(col("id").in_(entity_ids)).run()
+
+        if not isinstance(result, list):
+            raise ValueError("Result is not a list")
+
+        updated = self._validate_many(result)
+
+        self._logger.debug("Updated entities: %s", updated)
         return updated
 
     def delete(self, entity_id: ID, soft: bool = False) -> bool:
         try:
             self._model.delete().where(col("id") == entity_id).run()
-            self._logger.debug(f"Successful deleted entity: {entity_id}")
+            self._logger.debug("Successful deleted entity: %s", entity_id)
             return True
         except Exception as e:
             print(e)
             return False
 
     def get_by_id(self, entity_id: ID, include_relations: bool = False) -> Optional[T]:
-        self._logger.debug(f"Get entity with id: {entity_id}")
+        self._logger.debug("Get entity with id: %s", entity_id)
         result = self._model.select().where(col("id") == (entity_id)).run()
 
         if not isinstance(result, list):
@@ -139,22 +230,19 @@ class SmolORMRepository(Generic[ID, T], IRepository[ID, T]):
             raise ValueError("No entity with id {entity_id} found.")
 
         result = result[0]
-        result = deserialize(result)
+        result = deserialize(result, self._deserialize_plan)
         return self._pydantic_model.model_validate(result)
 
     def get_many_by_ids(
         self, entity_ids: list[ID], include_relations: bool = False
     ) -> list[T]:
-        self._logger.debug(f"Get all entities with ids: {entity_ids}")
+        self._logger.debug("Get all entities with ids: %s", entity_ids)
         result = self._model.select().where(col("id").in_(entity_ids)).run()
 
         if not isinstance(result, list):
             raise ValueError("Result is not a list")
 
-        result = map(
-            lambda x: self._pydantic_model.model_validate(deserialize(x)), result
-        )
-        return list(result)
+        return self._validate_many(result)
 
     def list_all(self) -> list[T]:
         self._logger.debug("Get all entities")
@@ -163,30 +251,43 @@ class SmolORMRepository(Generic[ID, T], IRepository[ID, T]):
         if not isinstance(result, list):
             raise ValueError("Result is not a list")
 
-        result = map(
-            lambda x: self._pydantic_model.model_validate(deserialize(x)), result
-        )
-        return list(result)
+        return self._validate_many(result)
 
-    def exists(self, filters: list[FilterQuery]) -> bool:
-        self._logger.debug(f"Check existence of entities with filters: {filters}")
-        final_expression = FilterExpressionEvaluator.chain_filter_queries_to_sql_query(
-            filters
-        )
+    def _query(self, filters: list[FilterQuery], *cols: str) -> ORM:
+        query = self._model.select(*cols)
+        if filters:
+            query = query.where(
+                FilterExpressionEvaluator.chain_filter_queries_to_sql_query(filters)
+            )
+        return query
 
-        result = self._model.select().where(final_expression).limit(1).run()
+    def exists(self, filters: list[FilterQuery]) -> bool:
+        self._logger.debug("Check existence of entities with filters: %s", filters)
+        result = self._query(filters, "1").limit(1).run()
 
         return len(result) > 0
 
     def count(self, filters: list[FilterQuery]) -> int:
-        self._logger.debug(f"Count entities with filters: {filters}")
-        final_expression = FilterExpressionEvaluator.chain_filter_queries_to_sql_query(
-            filters
-        )
-
-        result = self._model.select().where(final_expression).limit(1).run()
-
-        return len(result)
+        self._logger.debug("Count entities with filters: %s", filters)
+        result = self._query(filters, "COUNT(*)").run()
+
+        return result[0]["COUNT(*)"]
+
+    def _seek(
+        self, cursor: Any, order_by: Optional[str], descending: bool
+    ) -> Optional[Expr]:
+        """Condition for the rows after cursor in filter order, None if it is gone"""
+        cursor_id = int(cursor)
+        if order_by is None or order_by == "id":
+            return col("id") < cursor_id if descending else col("id") > cursor_id
+
+        rows = self._model.select(order_by).where(col("id") == cursor_id).run()
+        if not rows or rows[0][order_by] is None:
+            return None
+        value = rows[0][order_by]
+        after = col(order_by) < value if descending else col(order_by) > value
+        # Ties are broken by ascending id, like the in-memory stable sort
+        return after | ((col(order_by) == value) & (col("id") > cursor_id))
 
     def filter(
         self,
@@ -198,22 +299,59 @@ class SmolORMRepository(Generic[ID, T], IRepository[ID, T]):
         cursor: Optional[Any] = None,
         distinct: bool = False,
     ) -> PaginatedResult[T]:
-        final_expression = FilterExpressionEvaluator.chain_filter_queries_to_sql_query(
-            filters
-        )
-
-        result = self._model.select().where(final_expression).run()
-
-        total = len(result)
+        descending = descending and order_by is not None  # ignored when unordered
+        if order_by:
+            # Rows without a sort value are dropped, as in InMemoryRepository
+            filters = [*filters, FilterQuery(order_by, FilterOp.NEQ, None)]
+
+        conditions: list[Expr] = []
+        if filters:
+            conditions.append(
+                FilterExpressionEvaluator.chain_filter_queries_to_sql_query(filters)
+            )
+        if cursor is not None:
+            seek = self._seek(cursor, order_by, descending)
+            if seek is None:
+                return PaginatedResult(
+                    result=[], total=0, has_next=False, next_cursor=None
+                )
+            conditions.append(seek)
+        where = reduce(lambda x, y: x & y, conditions) if conditions else None
+
+        query = self._model.select()
+        if where is not None:
+            query = query.where(where)
+        if order_by and order_by != "id":
+            query = query.order_by(order_by, descending).order_by("id")
+        else:
+            query = query.order_by("id", descending)
+        if limit is not None:
+            query = query.limit(limit + 1)  # one extra row tells us has_next
+        if offset:
+            query = query.offset(offset)
+
+        result = query.run()
 
         has_next = False
         next_cursor = None
 
-        self._logger.debug(f"Filtered entities: {result}")
+        if limit is not None:
+            has_next = len(result) > limit
+            result = result[:limit]
+            if has_next:
+                next_cursor = str(result[-1]["id"])
 
-        result = list(
-            map(lambda x: self._pydantic_model.model_validate(deserialize(x)), result)
-        )
+        if limit is None and not offset:
+            total = len(result)
+        else:
+            count = self._model.select("COUNT(*)")
+            if where is not None:
+                count = count.where(where)
+            total = count.run()[0]["COUNT(*)"]
+
+        self._logger.debug("Filtered entities: %s", result)
+
+        result = self._validate_many(result)
 
         return PaginatedResult(
             result=result, total=total, has_next=has_next, next_cursor=next_cursor
@@ -221,4 +359,5 @@ class SmolORMRepository(Generic[ID, T], IRepository[ID, T]):
 
     @contextmanager
     def atomic(self):
-        yield
+        with session():
+            yield
@@ -54,6 +54,13 @@ def test_get_by_id_returns_none_for_missing(repository):
     assert repository.get_by_id(9999) is None
 
 
+def test_get_many_by_ids_skips_missing_and_keeps_store_order(repository):
+    for name in ["A", "B", "C"]:
+        repository.create(DummyModel(name=name))
+    entities = repository.get_many_by_ids([3, 9999, 1, 3])
+    assert [e.name for e in entities] == ["A", "C"]
+
+
 def test_list_all_returns_all_entities(repository):
     repository.create(DummyModel(name="A"))
     repository.create(DummyModel(name="B"))
@@ -71,6 +78,14 @@ def test_update_entity_patch(repository):
     assert updated.updated_at > created.updated_at
 
 
+def test_rapid_writes_get_increasing_timestamps(repository):
+    created = repository.create(DummyModel(name="v0"))
+    stamps = [created.updated_at]
+    for n in range(1, 50):
+        stamps.append(repository.update(created.id, {"name": f"v{n}"}).updated_at)
+    assert all(a < b for a, b in zip(stamps, stamps[1:]))
+
+
 def test_update_nonexistent_entity_raises(repository):
     with pytest.raises(InMemoryRepositoryValueException):
         repository.update(1234, {"name": "Should fail"})
@@ -119,6 +134,26 @@ def test_filter_basic(repository):
     assert result.has_next is True
 
 
+def test_filter_descending_first_page(repository):
+    for name in ["b", "d", "a", "c"]:
+        repository.create(DummyModel(name=name))
+    result = repository.filter(filters=[], order_by="name", descending=True, limit=2)
+    assert [e.name for e in result.result] == ["d", "c"]
+    assert result.total == 4
+    assert result.has_next is True
+
+
+def test_filter_offset_page_matches_full_sort(repository):
+    names = [f"n{(7 * i) % 20:02d}" for i in range(20)]
+    for name in names:
+        repository.create(DummyModel(name=name))
+    result = repository.filter(
+        filters=[], order_by="name", descending=True, limit=2, offset=3
+    )
+    assert [e.name for e in result.result] == sorted(names, reverse=True)[3:5]
+    assert result.has_next is True
+
+
 def test_filter_with_cursor_and_offset(repository):
     for n in range(5):
         repository.create(DummyModel(name=chr(65 + n)))  # names: A, B, C, D, E
@@ -130,3 +165,44 @@ def test_filter_with_cursor_and_offset(repository):
     )
     assert len(second_page.result) == 2
     assert first_page.next_cursor != second_page.next_cursor
+
+
+def test_filter_cursor_resumes_after_given_id(repository):
+    for n in range(5):
+        repository.create(DummyModel(name=chr(65 + n)))
+
+    page = repository.filter(filters=[], order_by="id", cursor=2)
+    assert [e.id for e in page.result] == [3, 4, 5]
+    page = repository.filter(filters=[], order_by="name", descending=True, cursor=4)
+    assert [e.name for e in page.result] == ["C", "B", "A"]
+    assert repository.filter(filters=[], cursor=42).result == []
+
+
+def test_repeated_filter_sees_writes(repository):
+    for name in ("b", "a", "c"):
+        repository.create(DummyModel(name=name))
+    query = [FilterQuery("name", FilterOp.NEQ, "a")]
+
+    assert [e.name for e in repository.filter(query, order_by="name").result] == [
+        "b",
+        "c",
+    ]
+    repository.update(1, {"name": "d"})
+    repository.delete(3)
+    assert [e.name for e in repository.filter(query, order_by="name").result] == ["d"]
+
+
+def test_atomic_rolls_back_on_error():
+    repository = InMemoryRepository[int, DummyModel](indexed_fields=("name",))
+    repository.create(DummyModel(name="kept"))
+
+    with pytest.raises(RuntimeError):
+        with repository.atomic():
+            repository.create(DummyModel(name="dropped"))
+            repository.update(1, {"name": "renamed"})
+            raise RuntimeError
+
+    assert [e.name for e in repository.list_all()] == ["kept"]
+    assert repository.count([FilterQuery("name", FilterOp.EQ, "kept")]) == 1
+    assert not repository.exists([FilterQuery("name", FilterOp.EQ, "renamed")])
+    assert repository.create(DummyModel(name="next")).id == 2
@@ -3,6 +3,7 @@ from pydantic import BaseModel
 import pytest
 from datetime import datetime, timedelta
 
+from libs.filter.filter_expression_evaluator import FilterExpressionEvaluator
 from modules.repositories.abstract_repository import FilterOp, FilterQuery
 from modules.repositories.in_memory_repository import InMemoryRepository
 
@@ -28,8 +29,7 @@ def setup_data(repository):
         DummyModel(name="delta", score=40, created_at=now - timedelta(days=2)),
         DummyModel(name="Echo", score=50, created_at=now - timedelta(days=1)),
     ]
-    for e in entities:
-        repository.create(e)
+    repository.create_many(entities)
     return entities
 
 
@@ -114,6 +114,18 @@ def test_filter_combined_conditions(repository, setup_data):
     assert names == {"Charlie", "delta"}
 
 
+def test_filter_skips_unset_values_whatever_the_filter_order(repository):
+    repository.create_many([DummyModel(name="beta", score=1), DummyModel(name="gamma")])
+
+    result = repository.filter(
+        filters=[
+            FilterQuery("name", FilterOp.ICONTAINS, "bet"),
+            FilterQuery("score", FilterOp.LT, 5),
+        ]
+    ).result
+    assert [e.name for e in result] == ["beta"]
+
+
 def test_filter_on_missing_field(repository, setup_data):
     result = repository.filter(
         filters=[FilterQuery("nonexistent", FilterOp.EQ, "value")]
@@ -134,3 +146,53 @@ def test_filter_isnull(repository):
     repository.create(model)
     result = repository.filter(filters=[FilterQuery("score", FilterOp.EQ, None)]).result
     assert len(result) == 1
+
+
+def test_indexed_filter_tracks_updates_and_deletes(setup_data):
+    repository = InMemoryRepository[int, DummyModel](indexed_fields=("score",))
+    repository.create_many(setup_data)
+
+    repository.update(1, {"score": 30})
+    repository.delete(3)
+
+    result = repository.filter(
+        filters=[
+            FilterQuery("score", FilterOp.EQ, 30),
+            FilterQuery("name", FilterOp.ICONTAINS, "a"),
+        ]
+    ).result
+    assert [e.name for e in result] == ["Alpha"]
+    assert repository.count([FilterQuery("score", FilterOp.EQ, 10)]) == 0
+    assert repository.exists([FilterQuery("score", FilterOp.EQ, 30)])
+
+    in_filter = [FilterQuery("score", FilterOp.IN, [30, 40, 99])]
+    assert [e.name for e in repository.filter(in_filter).result] == ["Alpha", "delta"]
+    assert repository.count(in_filter) == 2
+
+
+def test_compiled_filters_keep_equal_values_of_other_types_apart():
+    entities = [DummyModel(name=name) for name in ("v1.0", "x1", "True")]
+
+    def names(value):
+        match = FilterExpressionEvaluator.compile(
+            [FilterQuery("name", FilterOp.ICONTAINS, value)]
+        )
+        return [e.name for e in entities if match(e)]
+
+    assert names(1) == ["v1.0", "x1"]
+    assert names(1.0) == ["v1.0"]
+    assert names(True) == ["True"]
+    assert names(1) == ["v1.0", "x1"]
+
+
+def test_filter_cache_keeps_equal_values_of_other_types_apart(repository):
+    repository.create_many([DummyModel(name=n) for n in ("v1.0", "x1", "True")])
+
+    def names(value):
+        filters = [FilterQuery("name", FilterOp.ICONTAINS, value)]
+        repository.count(filters)  # fills the repository's match cache
+        return [e.name for e in repository.filter(filters).result]
+
+    assert names(1) == ["v1.0", "x1"]
+    assert names(1.0) == ["v1.0"]
+    assert names(True) == ["True"]
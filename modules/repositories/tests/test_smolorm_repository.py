@@ -0,0 +1,165 @@
+from enum import Enum
+from typing import Optional
+
+import pytest
+from pydantic import BaseModel
+from datetime import datetime, timedelta
+
+from modules.repositories.abstract_repository import FilterOp, FilterQuery
+from modules.repositories.smol_sql_repository import SmolORMRepository
+from smolorm.sqlmodel import EnumField, IntField, ListField, SqlModel, TextField
+
+
+class Tier(Enum):
+    LOW = 0
+    HIGH = 1
+
+
+class DummyModel(BaseModel):
+    id: int = -100
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    deleted_at: Optional[datetime] = None
+    name: str
+    score: int = 0
+    tier: Tier = Tier.LOW
+    tags: list[str] = []
+
+
+class DummySqlModel(SqlModel):
+    table_name: str = "test_repository_items"
+    name = TextField(default_value="")
+    score = IntField(default_value=0)
+    tier = EnumField(default_value=Tier.LOW)
+    tags = ListField(default_value=[])
+
+
+@pytest.fixture
+def repository():
+    DummySqlModel.drop()
+    yield SmolORMRepository[int, DummyModel](DummySqlModel, DummyModel)
+    DummySqlModel.drop()
+
+
+@pytest.fixture
+def setup_data(repository):
+    return repository.create_many(
+        [
+            DummyModel(name="Alpha", score=10, tags=["a"]),
+            DummyModel(name="Bravo", score=20, tier=Tier.HIGH),
+            DummyModel(name="Charlie", score=30, tier=Tier.HIGH, tags=["a", "c"]),
+            DummyModel(name="delta", score=40),
+            DummyModel(name="Echo", score=50, tier=Tier.HIGH),
+        ]
+    )
+
+
+def test_create_round_trips_fields(repository):
+    created = repository.create(
+        DummyModel(name="123", score=7, tier=Tier.HIGH, tags=["x", "y"])
+    )
+    fetched = repository.get_by_id(created.id)
+    assert fetched is not None
+    assert fetched.name == "123"
+    assert fetched.score == 7
+    assert fetched.tier == Tier.HIGH
+    assert fetched.tags == ["x", "y"]
+    assert isinstance(fetched.created_at, datetime)
+
+
+def test_update_and_update_many(repository, setup_data):
+    updated = repository.update(setup_data[0].id, {"name": "Alpha2"})
+    assert updated.name == "Alpha2"
+
+    updated = repository.update_many(
+        [setup_data[1].id, setup_data[2].id], {"tier": Tier.LOW}
+    )
+    assert {e.tier for e in updated} == {Tier.LOW}
+
+
+def test_update_accepts_raw_enum_and_datetime_values(repository, setup_data):
+    updated = repository.update(
+        setup_data[0].id, {"tier": 1, "deleted_at": "2024-01-01T00:00:00"}
+    )
+    assert updated.tier == Tier.HIGH
+    assert updated.deleted_at == datetime(2024, 1, 1)
+
+
+def test_count_and_exists(repository, setup_data):
+    high = [FilterQuery("tier", FilterOp.EQ, Tier.HIGH.value)]
+    assert repository.count(high) == 3
+    assert repository.count([]) == 5
+    assert repository.exists(high)
+    assert not repository.exists([FilterQuery("name", FilterOp.EQ, "Zulu")])
+
+
+def test_filter_chains_many_conditions(repository, setup_data):
+    result = repository.filter(
+        filters=[
+            FilterQuery("score", FilterOp.GT, 10),
+            FilterQuery("score", FilterOp.LT, 50),
+            FilterQuery("tier", FilterOp.EQ, Tier.HIGH.value),
+        ]
+    ).result
+    assert [e.name for e in result] == ["Bravo", "Charlie"]
+
+
+def test_filter_compares_datetimes_as_stored(repository, setup_data):
+    later = datetime.now() + timedelta(hours=1)
+    filters = [FilterQuery("created_at", FilterOp.LT, later)]
+    assert len(repository.filter(filters).result) == len(setup_data)
+
+    filters = [FilterQuery("created_at", FilterOp.GT, later)]
+    assert repository.filter(filters).result == []
+
+
+def test_filter_paginates_with_cursor(repository, setup_data):
+    first = repository.filter(filters=[], order_by="score", descending=True, limit=2)
+    assert [e.name for e in first.result] == ["Echo", "delta"]
+    assert first.total == 5
+    assert first.has_next is True
+
+    second = repository.filter(
+        filters=[],
+        order_by="score",
+        descending=True,
+        limit=2,
+        cursor=first.next_cursor,
+    )
+    assert [e.name for e in second.result] == ["Charlie", "Bravo"]
+    assert second.total == 3
+
+
+def test_get_many_by_ids_and_delete(repository, setup_data):
+    ids = [setup_data[0].id, setup_data[3].id]
+    assert [e.name for e in repository.get_many_by_ids(ids)] == ["Alpha", "delta"]
+
+    assert repository.delete(setup_data[0].id)
+    assert [e.name for e in repository.get_many_by_ids(ids)] == ["delta"]
+
+
+def test_atomic_rolls_back_on_error(repository, setup_data):
+    with pytest.raises(RuntimeError):
+        with repository.atomic():
+            repository.create(DummyModel(name="Foxtrot", score=60))
+            repository.update(setup_data[0].id, {"score": 99})
+            raise RuntimeError
+
+    assert repository.count([]) == 5
+    assert repository.get_by_id(setup_data[0].id).score == 10
+
+    with repository.atomic():
+        created = repository.create(DummyModel(name="Golf", score=70))
+    assert repository.get_by_id(created.id) is not None
+
+
+def test_filter_keeps_equal_values_of_other_types_apart(repository):
+    repository.create_many([DummyModel(name=n) for n in ("v1.0", "x1", "True")])
+
+    def names(value):
+        filters = [FilterQuery("name", FilterOp.ICONTAINS, value)]
+        return [e.name for e in repository.filter(filters).result]
+
+    assert names(1) == ["v1.0", "x1"]
+    assert names(1.0) == ["v1.0"]
+    assert names(True) == ["True"]
@@ -0,0 +1,209 @@
+from datetime import datetime
+from enum import Enum
+from itertools import combinations
+
+import pytest
+
+pytest.importorskip("tinydb")
+
+from tinydb import Query, TinyDB, where  # noqa: E402
+from tinydb.storages import MemoryStorage  # noqa: E402
+
+from modules.repositories.utils import tinydb_query_builder  # noqa: E402
+from modules.repositories.utils.tinydb_query_builder import (  # noqa: E402
+    TinyDBQueryBuilder,
+)
+
+
+class Color(Enum):
+    RED = "red"
+    BLUE = "blue"
+
+
+DOCUMENTS = [
+    {"name": "Alpha", "age": 5, "color": "red", "when": "2020-01-01T00:00:00"},
+    {"name": "alpha", "age": 30, "color": "blue", "tags": ["a", "b"]},
+    {"name": "BETA", "age": None, "color": None, "when": "2024-01-01T00:00:00"},
+    {"name": "gamma", "age": 1, "tags": "ab"},
+    {"name": "Gam", "color": "red", "tags": []},
+    {"name": "", "age": 10, "when": None},
+    {"name": None, "age": 5, "color": "blue"},
+    {"name": 5, "tags": ["a"]},
+    {"age": 30, "color": "red"},
+    {},
+]
+
+CASES = [
+    (f"name__{op}", value)
+    for op in (
+        "eq",
+        "neq",
+        "contains",
+        "icontains",
+        "startswith",
+        "istartswith",
+        "endswith",
+        "iendswith",
+    )
+    for value in ("al", "AL", "a", "Gam", "", None)
+]
+CASES += [
+    (f"age__{op}", value)
+    for op in ("eq", "neq", "lt", "lte", "gt", "gte")
+    for value in (5, 0, None)
+]
+CASES += [
+    ("age", 5),
+    ("age__in", [1, 5]),
+    ("age__in", (None,)),
+    ("age__notin", [1, 5]),
+    ("name__in", ("Gam", None)),
+    ("color__eq", Color.RED),
+    ("color__neq", Color.BLUE),
+    ("when__lt", datetime(2022, 1, 1)),
+    ("when__gte", datetime(2020, 1, 1)),
+    ("tags__contains", "a"),
+    ("name__isnull", True),
+    ("name__isnull", False),
+    ("age__isnull", True),
+]
+
+
+def _reference_condition(key, expected):
+    """One TinyDB where() node per filter, the way the builder used to work"""
+    attr, _, op = key.partition("__")
+    field = where(attr)
+    if isinstance(expected, datetime):
+        expected = expected.isoformat()
+    elif isinstance(expected, Enum):
+        expected = expected.value
+
+    match op or "eq":
+        case "eq":
+            return field == expected
+        case "neq":
+            return field != expected
+        case "lt":
+            return field.test(lambda v, e: v is not None and v < e, expected)
+        case "lte":
+            return field.test(lambda v, e: v is not None and v <= e, expected)
+        case "gt":
+            return field.test(lambda v, e: v is not None and v > e, expected)
+        case "gte":
+            return field.test(lambda v, e: v is not None and v >= e, expected)
+        case "isnull":
+            return ~field.exists() if expected else field.exists()
+        case "in":
+            return field.one_of(expected)
+        case "notin":
+            return field.test(lambda v, e: v not in e, expected)
+        case "contains":
+            return field.test(
+                lambda v, e: e in v if isinstance(v, (str, list)) else False, expected
+            )
+        case "icontains":
+            return field.test(
+                lambda v, e: isinstance(v, str) and str(e).lower() in v.lower(),
+                expected,
+            )
+        case "startswith":
+            return field.test(
+                lambda v, e: isinstance(v, str) and v.startswith(str(e)), expected
+            )
+        case "istartswith":
+            return field.test(
+                lambda v, e: isinstance(v, str)
+                and v.lower().startswith(str(e).lower()),
+                expected,
+            )
+        case "endswith":
+            return field.test(
+                lambda v, e: isinstance(v, str) and v.endswith(str(e)), expected
+            )
+        case "iendswith":
+            return field.test(
+                lambda v, e: isinstance(v, str) and v.lower().endswith(str(e).lower()),
+                expected,
+            )
+
+
+def _reference_query(filters):
+    conditions = [_reference_condition(k, v) for k, v in filters.items()]
+    if not conditions:
+        return Query().noop()
+    query = conditions[0]
+    for condition in conditions[1:]:
+        query &= condition
+    return query
+
+
+@pytest.fixture(scope="module")
+def table():
+    db = TinyDB(storage=MemoryStorage)
+    table = db.table("documents")
+    table.insert_multiple(DOCUMENTS)
+    return table
+
+
+def _outcome(table, build, filters):
+    """Matching document ids, or the error a comparison like None < 5 raises"""
+    try:
+        return sorted(doc.doc_id for doc in table.search(build(filters)))
+    except TypeError as e:
+        return type(e)
+
+
+@pytest.mark.parametrize("key,expected", CASES)
+def test_single_filter_matches_reference(table, key, expected):
+    filters = {key: expected}
+    assert _outcome(table, TinyDBQueryBuilder.build_tinydb_query, filters) == (
+        _outcome(table, _reference_query, filters)
+    )
+
+
+def test_each_filter_keeps_its_own_value(table):
+    filters = {"name__icontains": "AL", "color__startswith": "bl"}
+    result = table.search(TinyDBQueryBuilder.build_tinydb_query(filters))
+    assert [doc["name"] for doc in result] == ["alpha"]
+
+
+def _pairs(table):
+    # Filters that raise on their own (None < 5) are left out: whether they
+    # raise in a pair depends on which filter runs first, by design
+    cases = [
+        (key, expected)
+        for key, expected in CASES
+        if _outcome(table, _reference_query, {key: expected}) is not TypeError
+    ]
+    return [dict(pair) for pair in combinations(cases, 2) if pair[0][0] != pair[1][0]]
+
+
+def test_cost_ordering_does_not_change_results(table, monkeypatch):
+    pairs = _pairs(table)
+    ordered = [_outcome(table, tinydb_query_builder._build, f.items()) for f in pairs]
+
+    monkeypatch.setattr(tinydb_query_builder, "_cost", lambda item: 0)
+    unordered = [_outcome(table, tinydb_query_builder._build, f.items()) for f in pairs]
+
+    assert ordered == unordered
+
+
+def test_paired_filters_match_reference(table):
+    for filters in _pairs(table):
+        assert _outcome(table, TinyDBQueryBuilder.build_tinydb_query, filters) == (
+            _outcome(table, _reference_query, filters)
+        ), filters
+
+
+def test_no_filters_match_every_document(table):
+    assert len(table.search(TinyDBQueryBuilder.build_tinydb_query({}))) == len(
+        DOCUMENTS
+    )
+
+
+@pytest.mark.parametrize(
+    "filters", [{"age__in": 5}, {"age__notin": "a"}, {"age__x": 1}]
+)
+def test_invalid_filters_raise(filters):
+    with pytest.raises(ValueError):
+        TinyDBQueryBuilder.build_tinydb_query(filters)
@@ -1,8 +1,168 @@
-from typing import Dict, Any
-from tinydb import Query, where
+import operator
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Optional
+from tinydb import Query
+from tinydb.queries import QueryInstance
 from datetime import datetime
 from enum import Enum  # Added Enum import to handle enum values in filters correctly
 
+Test = Callable[[Any, Any], bool]
+FrozenFilters = tuple[tuple[str, type, Any], ...]
+
+# Cheap comparisons run first so the predicate can bail out before string work
+_COST = {
+    "eq": 0,
+    "neq": 0,
+    "isnull": 0,
+    "in": 1,
+    "notin": 1,
+    "lt": 1,
+    "lte": 1,
+    "gt": 1,
+    "gte": 1,
+    "startswith": 2,
+    "endswith": 2,
+    "contains": 2,
+    "icontains": 3,
+    "istartswith": 3,
+    "iendswith": 3,
+}
+
+
+def _cost(item: tuple[str, Any]) -> int:
+    parts = item[0].split("__")
+    return _COST.get(parts[1] if len(parts) > 1 else "eq", 0)
+
+
+def _ignorecase(pattern: str) -> re.Pattern:
+    return re.compile(pattern, re.IGNORECASE)
+
+
+# Documents come from JSON, so strings and lists are never subclasses and an
+# exact type check is enough; the str methods are bound once, not looked up per row
+_startswith = str.startswith
+_endswith = str.endswith
+
+
+def _matches(value: Any, find: Callable[[str], Optional[re.Match]]) -> bool:
+    return type(value) is str and find(value) is not None
+
+
+def _ordered(compare: Test) -> Test:
+    # Ordering comparisons only run on values that are set and comparable
+    return lambda v, e: v is not None and compare(v, e)
+
+
+# op -> test(value, prepared expected); a field missing from the document fails
+# every test except isnull=True, as TinyDB's own path lookups do
+_TESTS: dict[str, Test] = {
+    "eq": operator.eq,
+    "neq": operator.ne,
+    "lt": _ordered(operator.lt),
+    "lte": _ordered(operator.le),
+    "gt": _ordered(operator.gt),
+    "gte": _ordered(operator.ge),
+    # The key is present here, which only satisfies isnull=False
+    "isnull": lambda v, e: not e,
+    "in": lambda v, e: v in e,
+    "notin": lambda v, e: v not in e,
+    "contains": lambda v, e: (type(v) is str or type(v) is list) and e in v,
+    "icontains": _matches,
+    "startswith": lambda v, e: type(v) is str and _startswith(v, e),
+    "istartswith": _matches,
+    "endswith": lambda v, e: type(v) is str and _endswith(v, e),
+    "iendswith": _matches,
+}
+
+
+def _prepare(op: str, expected: Any) -> Any:
+    """Normalize an expected value once, at build time"""
+    match op:
+        case "eq" | "neq" | "lt" | "lte" | "gt" | "gte":
+            # Stored documents hold datetimes as ISO strings and enums as values
+            if isinstance(expected, datetime):
+                return expected.isoformat()
+            if isinstance(expected, Enum):
+                return expected.value
+            return expected
+        case "in" | "notin":
+            if not isinstance(expected, (list, tuple)):
+                raise ValueError(
+                    f"For '{op}' operator, expected value must be a list or tuple. Got {type(expected)}"
+                )
+            return expected
+        case "startswith" | "endswith":
+            return str(expected)
+        # Case-insensitive ops compile their pattern once per filter
+        # instead of lowering both strings for every document
+        case "icontains":
+            return _ignorecase(re.escape(str(expected))).search
+        case "istartswith":
+            return _ignorecase(re.escape(str(expected))).match
+        case "iendswith":
+            return _ignorecase(re.escape(str(expected)) + r"\Z").search
+        case _:
+            return expected
+
+
+def _build(items: Iterable[tuple[str, Any]]) -> QueryInstance:
+    # Compile every filter into (attr, test, expected, result if missing) once,
+    # then test them all from one function instead of a chain of Query nodes
+    specs = []
+    for key, expected in sorted(items, key=_cost):
+        parts = key.split("__")
+        attr = parts[0]
+        op = parts[1] if len(parts) > 1 else "eq"  # Default operator is 'eq'
+
+        test = _TESTS.get(op)
+        if test is None:
+            raise ValueError(f"Unsupported filter operator: {op}")
+
+        if_missing = op == "isnull" and bool(expected)
+        specs.append((attr, test, _prepare(op, expected), if_missing))
+
+    if not specs:
+        return (
+            Query().noop()
+        )  # If no filters, return a query that matches all documents
+
+    def predicate(doc: Dict[str, Any]) -> bool:
+        for attr, test, expected, if_missing in specs:
+            if attr not in doc:
+                if not if_missing:
+                    return False
+            elif not test(doc[attr], expected):
+                return False
+        return True
+
+    # No hash value: TinyDB must not cache results for an ad-hoc query
+    return QueryInstance(predicate, None)
+
+
+def _freeze(filters: Dict[str, Any]) -> FrozenFilters:
+    """Hashable cache key; the value type is kept so True and 1 stay distinct"""
+    return tuple(
+        sorted(
+            (
+                key,
+                type(value),
+                (
+                    tuple(value)
+                    if key.endswith(("__in", "__notin")) and isinstance(value, list)
+                    else value
+                ),
+            )
+            for key, value in filters.items()
+        )
+    )
+
+
+@lru_cache(maxsize=1024)
+def _build_cached(frozen: FrozenFilters) -> QueryInstance:
+    # The built query holds no state, so recurring filter shapes share one
+    return _build((key, value) for key, _, value in frozen)
+
 
 class TinyDBQueryBuilder:
     """
@@ -28,7 +188,7 @@ class TinyDBQueryBuilder:
     """
 
     @staticmethod
-    def build_tinydb_query(filters: Dict[str, Any]) -> Query:
+    def build_tinydb_query(filters: Dict[str, Any]) -> QueryInstance:
         """
         Builds a TinyDB Query object from a dictionary of filters.
 
@@ -38,119 +198,14 @@ class TinyDBQueryBuilder:
                                       are the expected comparison values.
 
         Returns:
-            Query: A TinyDB Query object representing the combined conditions.
+            QueryInstance: A single TinyDB query testing all conditions in one call.
                    Returns Query().noop() if no filters are provided, effectively matching all documents.
 
         Raises:
             ValueError: If an unsupported filter operator is encountered,
                         or if 'in'/'notin' operators receive non-list/tuple expected values.
         """
-        query_conditions = []  # Accumulates individual TinyDB query conditions
-
-        for key, expected in filters.items():
-            parts = key.split("__")
-            attr = parts[0]
-            op = parts[1] if len(parts) > 1 else "eq"  # Default operator is 'eq'
-
-            condition = None
-            q_attr = where(attr)  # Create the query object for the attribute
-
-            # Normalize expected values for comparison, especially for datetime and Enum
-            expected_for_query = expected
-            if isinstance(expected, datetime):
-                expected_for_query = expected.isoformat()
-            elif isinstance(expected, Enum):
-                expected_for_query = expected.value
-
-            match op:
-                case "eq":
-                    condition = q_attr == expected_for_query
-                case "neq":
-                    condition = q_attr != expected_for_query
-                case "lt":
-                    # Use .test() with a lambda to safely handle potential None values
-                    # and ensure comparison is only done if the value exists and is comparable.
-                    condition = q_attr.test(
-                        lambda v: v is not None and v < expected_for_query
-                    )
-                case "lte":
-                    condition = q_attr.test(
-                        lambda v: v is not None and v <= expected_for_query
-                    )
-                case "gt":
-                    condition = q_attr.test(
-                        lambda v: v is not None and v > expected_for_query
-                    )
-                case "gte":
-                    condition = q_attr.test(
-                        lambda v: v is not None and v >= expected_for_query
-                    )
-                case "isnull":
-                    # TinyDB's .exists() checks if a key exists AND its value is NOT None.
-                    # If expected is True, we want documents where the field is missing or None.
-                    # This is achieved by negating .exists(): `~q_attr.exists()`.
-                    # If expected is False, we want documents where the field exists and is not None.
-                    # This is simply `q_attr.exists()`.
-                    condition = ~q_attr.exists() if expected else q_attr.exists()
-                case "in":
-                    if not isinstance(expected, (list, tuple)):
-                        raise ValueError(
-                            f"For 'in' operator, expected value must be a list or tuple. Got {type(expected)}"
-                        )
-                    condition = q_attr.one_of(expected)
-                case "notin":
-                    if not isinstance(expected, (list, tuple)):
-                        raise ValueError(
-                            f"For 'notin' operator, expected value must be a list or tuple. Got {type(expected)}"
-                        )
-                    condition = q_attr.not_in(expected)
-                case "contains":
-                    condition = q_attr.test(
-                        lambda v: expected in v if isinstance(v, (str, list)) else False
-                    )
-                case "icontains":
-                    condition = q_attr.test(
-                        lambda v: (
-                            isinstance(v, str) and str(expected).lower() in v.lower()
-                        )
-                    )
-                case "startswith":
-                    condition = q_attr.test(
-                        lambda v: (isinstance(v, str) and v.startswith(str(expected)))
-                    )
-                case "istartswith":
-                    condition = q_attr.test(
-                        lambda v: (
-                            isinstance(v, str)
-                            and v.lower().startswith(str(expected).lower())
-                        )
-                    )
-                case "endswith":
-                    condition = q_attr.test(
-                        lambda v: (isinstance(v, str) and v.endswith(str(expected)))
-                    )
-                case "iendswith":
-                    condition = q_attr.test(
-                        lambda v: (
-                            isinstance(v, str)
-                            and v.lower().endswith(str(expected).lower())
-                        )
-                    )
-                case _:
-                    raise ValueError(f"Unsupported filter operator: {op}")
-
-            if condition is not None:
-                query_conditions.append(condition)
-
-        # Combine all conditions with logical AND
-        if not query_conditions:
-            return (
-                Query().noop()
-            )  # If no filters, return a query that matches all documents
-
-        # Chain all conditions using the bitwise AND operator (&)
-        final_query = query_conditions[0]
-        for cond in query_conditions[1:]:
-            final_query &= cond
-
-        return final_query
+        try:
+            return _build_cached(_freeze(filters))
+        except TypeError:  # unhashable filter value, build it uncached
+            return _build(filters.items())
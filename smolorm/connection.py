@@ -1,6 +1,71 @@
-from sqlalchemy import create_engine
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, Optional
+
+from sqlalchemy import Connection, create_engine
 
 SQLITE3 = "sqlite:///db.sqlite3"
 
 engine = create_engine(SQLITE3)
 
+_session: ContextVar[Optional[Connection]] = ContextVar("smolorm_session", default=None)
+_rollback_hooks: ContextVar[list[Callable[[], None]]] = ContextVar(
+    "smolorm_rollback_hooks"
+)
+
+
+@contextmanager
+def session(rollback: bool = False) -> Iterator[Connection]:
+    """
+    Run every statement in the block on one connection and one transaction,
+    committed on exit and rolled back on error. Nested sessions join the outer one.
+    With rollback=True the transaction is always discarded, as test fixtures want
+    """
+    current = _session.get()
+    if current is not None:
+        yield current
+        return
+
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        token = _session.set(connection)
+        hooks_token = _rollback_hooks.set([])
+        try:
+            yield connection
+        except BaseException:
+            transaction.rollback()
+            _run_rollback_hooks()
+            raise
+        else:
+            if rollback:
+                transaction.rollback()
+                _run_rollback_hooks()
+            else:
+                transaction.commit()
+        finally:
+            _rollback_hooks.reset(hooks_token)
+            _session.reset(token)
+
+
+def _run_rollback_hooks() -> None:
+    for hook in _rollback_hooks.get():
+        hook()
+
+
+def on_rollback(hook: Callable[[], None]) -> None:
+    """Call hook if the open session rolls back; outside a session, never"""
+    if _session.get() is not None:
+        _rollback_hooks.get().append(hook)
+
+
+@contextmanager
+def connect() -> Iterator[Connection]:
+    """The open session's connection, or a short-lived one committed on exit"""
+    current = _session.get()
+    if current is not None:
+        yield current
+        return
+
+    with engine.connect() as connection:
+        yield connection
+        connection.commit()
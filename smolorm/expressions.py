@@ -1,15 +1,47 @@
 from abc import ABC, abstractmethod
+from datetime import datetime
+from enum import Enum
+from typing import Any
+
+# Types sqlite3 binds natively; anything else is bound as its string form,
+# which is how it used to be inlined into the SQL text
+_BINDABLE = (str, int, float, bytes, type(None))
+
+
+def _bindable(value: Any) -> Any:
+    # Match how rows store these: ISO text with a "T" and the enum's value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return _bindable(value.value)
+    return value if isinstance(value, _BINDABLE) else str(value)
+
+
+def bind_param(params: dict[str, Any], value: Any, name: str = "") -> str:
+    """Store a value in params and return the placeholder to use in its place"""
+    name = name or f"p{len(params)}"
+    params[name] = _bindable(value)
+    return f":{name}"
 
 
 class Expr(ABC):
     """
     Abstrace Base Class for SQL Expression
+
+    Values are never inlined: to_sql() renders placeholders and collects the
+    values into params, so a query shape maps to a single SQL text
     """
 
     @abstractmethod
-    def to_sql(self):
+    def to_sql(self, params: dict[str, Any]) -> str:
         raise NotImplementedError()
 
+    def __and__(self, other):
+        return AndExpr(self, other)
+
+    def __or__(self, other):
+        return OrExpr(self, other)
+
 
 class BinaryExpr(Expr):
     def __init__(self, left, op, right):
@@ -17,15 +49,8 @@ class BinaryExpr(Expr):
         self.op = op
         self.right = right
 
-    def to_sql(self):
-        right = f"'{self.right}'" if isinstance(self.right, str) else str(self.right)
-        return f"{self.left} {self.op} {right}"
-
-    def __and__(self, other):
-        return AndExpr(self, other)
-
-    def __or__(self, other):
-        return OrExpr(self, other)
+    def to_sql(self, params: dict[str, Any]) -> str:
+        return f"{self.left} {self.op} {bind_param(params, self.right)}"
 
 
 class Column(Expr):
@@ -51,25 +76,19 @@ class Column(Expr):
         return BinaryExpr(self.name, ">=", other)
 
     def contains(self, val):
-        return FuncExpr(self.name, "LIKE", f'"%{val}%"')
+        return BinaryExpr(self.name, "LIKE", f"%{val}%")
 
     def startswith(self, val):
-        return FuncExpr(self.name, "LIKE", f'"{val}%"')
+        return BinaryExpr(self.name, "LIKE", f"{val}%")
 
     def endswith(self, val):
-        return FuncExpr(self.name, "LIKE", f'"%{val}"')
+        return BinaryExpr(self.name, "LIKE", f"%{val}")
 
     def in_(self, values: list) -> Expr:
-        val_str = ",".join(
-            [f"{v}" if isinstance(v, (int, float)) else f"'{v}'" for v in values]
-        )
-        return FuncExpr(self.name, "IN", f"({val_str})")
+        return InExpr(self.name, "IN", values)
 
     def not_in_(self, values: list) -> Expr:
-        val_str = ",".join(
-            [f"{v}" if isinstance(v, (int, float)) else f"'{v}'" for v in values]
-        )
-        return FuncExpr(self.name, "NOT IN", f"({val_str})")
+        return InExpr(self.name, "NOT IN", values)
 
     def null_(self) -> Expr:
         return FuncExpr(self.name, "IS ", "NULL")
@@ -77,7 +96,7 @@ class Column(Expr):
     def not_null_(self) -> Expr:
         return FuncExpr(self.name, "IS NOT ", "NULL")
 
-    def to_sql(self):
+    def to_sql(self, params: dict[str, Any]) -> str:
         return self.name
 
 
@@ -86,8 +105,8 @@ class AndExpr(Expr):
         self.left = left
         self.right = right
 
-    def to_sql(self):
-        return f"({self.left.to_sql()} AND {self.right.to_sql()})"
+    def to_sql(self, params: dict[str, Any]) -> str:
+        return f"({self.left.to_sql(params)} AND {self.right.to_sql(params)})"
 
 
 class OrExpr(Expr):
@@ -95,8 +114,19 @@ class OrExpr(Expr):
         self.left = left
         self.right = right
 
-    def to_sql(self):
-        return f"({self.left.to_sql()} OR {self.right.to_sql()})"
+    def to_sql(self, params: dict[str, Any]) -> str:
+        return f"({self.left.to_sql(params)} OR {self.right.to_sql(params)})"
+
+
+class InExpr(Expr):
+    def __init__(self, column, op, values):
+        self.column = column
+        self.op = op
+        self.values = values
+
+    def to_sql(self, params: dict[str, Any]) -> str:
+        placeholders = ", ".join(bind_param(params, v) for v in self.values)
+        return f"{self.column} {self.op} ({placeholders})"
 
 
 class FuncExpr(Expr):
@@ -105,15 +135,9 @@ class FuncExpr(Expr):
         self.op = op
         self.pattern = pattern
 
-    def to_sql(self):
+    def to_sql(self, params: dict[str, Any]) -> str:
         return f"{self.column} {self.op} {self.pattern}"
 
-    def __and__(self, other):
-        return AndExpr(self, other)
-
-    def __or__(self, other):
-        return OrExpr(self, other)
-
 
 def col(name):
     return Column(name)
@@ -1,7 +1,18 @@
-from typing import Any, Union
-from sqlalchemy import CursorResult, inspection, text
-from smolorm.connection import engine
-from smolorm.expressions import Expr
+import sqlite3
+from functools import lru_cache
+from typing import Any, Iterator, Union
+from sqlalchemy import CursorResult, text
+from smolorm.connection import connect
+from smolorm.expressions import Expr, bind_param
+
+# Values are bound, so statements repeat by shape; reuse their parsed TextClause
+_text = lru_cache(maxsize=256)(text)
+
+# INSERT ... RETURNING landed in SQLite 3.35
+HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+# SQLite builds before 3.32 cap a statement at 999 bound parameters
+_MAX_PARAMS = 999
 
 # Supported SQL Queries
 # SELECT *cols* FROM *table* WHERE *condition* AND/OR *condition* ... [Okay]
@@ -26,10 +37,10 @@ class ORM:
         self._columns = ["*"]
         self._where = None
         self._sql = ""
+        self._params: dict[str, Any] = {}
         self._lastopflag: str = "INIT"
-        self._is_create: bool = False
-        self._is_update: bool = False
-        self._is_delete: bool = False
+        # Statement kind, set once by select/create/update/delete, drives run()
+        self._kind: str = "SELECT"
 
     @classmethod
     def from_(cls, table_name):
@@ -39,33 +50,77 @@ class ORM:
 
     def update(self, fields: dict[str, Union[str, int]]):
         self._lastopflag = "UPDATE"
-        self._is_update = True
+        self._kind = "UPDATE"
 
-        query_str = f"UPDATE {self._table} SET "
-        for key, val in fields.items():
-            val = f'"{val}"' if isinstance(val, str) else val
-            query_str += f"{key} = {val}, "
-        query_str = query_str.rstrip(", ")
+        assignments = ", ".join(
+            f"{key} = {bind_param(self._params, val, f'set_{key}')}"
+            for key, val in fields.items()
+        )
 
-        self._sql = query_str
+        self._sql = f"UPDATE {self._table} SET {assignments}"
         return self
 
     def create(self, fields: dict[str, Union[str, int]]) -> int:
-        self._is_create = True
-        connection = engine.connect()
-        transaction = connection.begin()
+        self._kind = "INSERT"
 
         columns = ", ".join(fields.keys())
         placeholders = ", ".join([f":{key}" for key in fields.keys()])
         query_str = f"INSERT INTO {self._table} ({columns}) VALUES ({placeholders})"
 
-        cursor = connection.execute(text(query_str), fields)
-        transaction.commit()
-        connection.close()
+        with connect() as connection:
+            cursor = connection.execute(_text(query_str), fields)
         return cursor.lastrowid
 
+    def create_returning(self, fields: dict[str, Any]) -> dict[str, Any] | None:
+        """Insert a row and read it back in the same statement"""
+        self._kind = "INSERT"
+
+        columns = ", ".join(fields.keys())
+        placeholders = ", ".join([f":{key}" for key in fields.keys()])
+        query_str = (
+            f"INSERT INTO {self._table} ({columns}) VALUES ({placeholders}) RETURNING *"
+        )
+
+        with connect() as connection:
+            row = connection.execute(_text(query_str), fields).mappings().first()
+        return dict(row) if row is not None else None
+
+    def create_many_returning(self, rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """
+        Insert rows sharing the first row's keys with multi-row INSERT ... RETURNING
+        statements, so the created rows come from the inserts themselves
+        """
+        self._kind = "INSERT"
+
+        keys = list(rows[0].keys())
+        columns = ", ".join(keys)
+        chunk_size = max(1, _MAX_PARAMS // len(keys))
+
+        created: list[dict[str, Any]] = []
+        with connect() as connection:
+            for start in range(0, len(rows), chunk_size):
+                chunk = rows[start : start + chunk_size]
+                params = {
+                    f"r{i}_{key}": row[key]
+                    for i, row in enumerate(chunk)
+                    for key in keys
+                }
+                values = ", ".join(
+                    "(" + ", ".join(f":r{i}_{key}" for key in keys) + ")"
+                    for i in range(len(chunk))
+                )
+                query_str = (
+                    f"INSERT INTO {self._table} ({columns}) VALUES {values} RETURNING *"
+                )
+                cursor = connection.execute(_text(query_str), params)
+                created.extend(dict(row) for row in cursor.mappings())
+
+        # SQLite does not promise RETURNING order, ids do follow insertion order
+        created.sort(key=lambda row: row["id"])
+        return created
+
     def delete(self):
-        self._is_delete = True
+        self._kind = "DELETE"
         self._lastopflag = "DELETE"
 
         self._sql = f"DELETE FROM {self._table} "
@@ -81,12 +136,16 @@ class ORM:
     def where(self, expr: Expr):
         self._lastopflag = "WHERE"
         self._where = expr
-        self._sql += f" WHERE {expr.to_sql()}"
+        self._sql += f" WHERE {expr.to_sql(self._params)}"
         return self
 
     def order_by(self, column: str, descending: bool = False):
+        direction = "DESC" if descending else "ASC"
+        if self._lastopflag == "ORDER_BY":  # chained calls add tie-breakers
+            self._sql += f", {column} {direction}"
+        else:
+            self._sql += f" ORDER BY {column} {direction}"
         self._lastopflag = "ORDER_BY"
-        self._sql += f" ORDER BY {column} {'DESC' if descending else 'ASC'}"
         return self
 
     def limit(self, n: int):
@@ -105,41 +164,34 @@ class ORM:
         return self
 
     def run(self):
-        connection = engine.connect()
-        cursor = connection.execute(text(self._sql))
-        connection.commit()
-        connection.close()
+        if self._kind == "SELECT":
+            return list(self.stream())
 
-        if self._is_delete or self._is_update:
-            return self._fetch_rows()
+        with connect() as connection:
+            connection.execute(_text(self._sql), self._params)
 
-        return self._to_dict(cursor)
+        # Read back once the write is committed, or within the same session
+        return self._fetch_rows()
 
-    def _to_dict(self, cursor: CursorResult[Any]):
-        inspection_result = inspection.inspect(engine)
-        cols = inspection_result.get_columns(self._table or "")
-        cols = [col["name"] for col in cols]
-
-        self._columns = cols if self._columns == ["*"] else self._columns
-
-        rows = []
-
-        for r in cursor.fetchall():
-            rows.append(dict(zip(self._columns, r)))
+    def stream(self) -> Iterator[dict[str, Any]]:
+        """Yield rows one at a time, the connection stays open until exhausted"""
+        with connect() as connection:
+            cursor = connection.execute(_text(self._sql), self._params)
+            for row in cursor.mappings():
+                yield dict(row)
 
-        return rows
+    def _to_dict(self, cursor: CursorResult[Any]):
+        # Rows come keyed by the cursor's own column names, no table reflection
+        return [dict(row) for row in cursor.mappings().all()]
 
     def _fetch_rows(self):
         if not self._where:
             return []
 
-        where_clause = self._where.to_sql()
+        params: dict[str, Any] = {}
+        where_clause = self._where.to_sql(params)
         query_str = f"SELECT * FROM {self._table} WHERE {where_clause}"
 
-        connection = engine.connect()
-        cursor = connection.execute(text(query_str))
-
-        rows = self._to_dict(cursor)
-
-        connection.close()
-        return rows
+        with connect() as connection:
+            cursor = connection.execute(_text(query_str), params)
+            return self._to_dict(cursor)
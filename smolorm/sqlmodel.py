@@ -1,13 +1,12 @@
 from datetime import datetime
 import json
-from collections import OrderedDict
 from abc import ABC, abstractmethod
 from enum import Enum
 from typing import Any, Optional
 from sqlalchemy import text
-from smolorm.connection import engine
+from smolorm.connection import connect, on_rollback, session
 from smolorm.expressions import col
-from smolorm.orm import ORM
+from smolorm.orm import HAS_RETURNING, ORM
 
 
 class SmolField(ABC):
@@ -112,20 +111,47 @@ class SmolORMException(Exception):
         self.message = message
 
 
+def _create_table_sql(
+    table_name: str, columns: tuple[tuple[str, SmolField], ...]
+) -> str:
+    column_defs = ["id INTEGER PRIMARY KEY AUTOINCREMENT"]
+    for column_name, smol_field in columns:
+        parts = [column_name, smol_field.col_type]
+
+        if smol_field.required:
+            parts.append("NOT NULL")
+
+        if smol_field.sql_default_value is not None:
+            parts.append(f"DEFAULT {smol_field.sql_default_value}")
+
+        column_defs.append(" ".join(parts))
+
+    return f"CREATE TABLE IF NOT EXISTS {table_name} ({', '.join(column_defs)});"
+
+
 class SqlModel(ABC):
     table_name: str = ""
 
+    # Every model's CREATE TABLE, run lazily on first use or all at once by
+    # migrate_all(), so importing models never touches the database
+    _registry: list[type["SqlModel"]] = []
+    _ddl: str = ""
+    _migrated: bool = False
+    _coldefs: dict[str, SmolField] = {}
+
     created_at = DatetimeField(default_value=datetime.now())
     updated_at = DatetimeField(default_value=datetime.now())
     deleted_at = DatetimeField(required=False)
 
     @staticmethod
-    def _get_coldefs(_cls) -> OrderedDict[str, SmolField]:
-        columns = OrderedDict()
-        for key, val in _cls.__dict__.items():
-            if not isinstance(val, SmolField):
-                continue
-            columns[str(key)] = val
+    def _get_coldefs(_cls) -> dict[str, SmolField]:
+        # Walk bases first so the shared timestamp columns are part of every table
+        columns = {
+            key: val
+            for klass in reversed(_cls.__mro__)
+            for key, val in vars(klass).items()
+            if isinstance(val, SmolField)
+        }
 
         if len(columns) == 0:
             raise SmolORMException("No columns defined")
@@ -139,33 +165,51 @@ class SqlModel(ABC):
 
         columns = SqlModel._get_coldefs(cls)
 
-        query_str = f"CREATE TABLE IF NOT EXISTS {table_name} ("
-        query_str += "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+        query_str = _create_table_sql(table_name, tuple(columns.items()))
 
-        for column_name, smol_field in columns.items():
-            query_str += f"{column_name} "
-            query_str += smol_field.col_type
+        cls._coldefs = columns
+        cls._ddl = query_str
+        cls._migrated = False
+        if cls not in SqlModel._registry:
+            SqlModel._registry.append(cls)
+        return super().__init_subclass__()
 
-            if smol_field.required:
-                query_str += " NOT NULL "
+    @classmethod
+    def migrate(cls) -> None:
+        if cls._migrated:
+            return
 
-            if smol_field.sql_default_value is not None:
-                query_str += f" DEFAULT {smol_field.sql_default_value} "
+        print(f"==CREATE MODEL {cls.__name__} QUERY==:\n{cls._ddl}\n")
+        with connect() as connection:
+            connection.execute(text(cls._ddl))
+        cls._migrated = True
+        # The table only exists once the session commits
+        on_rollback(lambda: setattr(cls, "_migrated", False))
 
-            query_str += ", "
-        query_str = query_str.rstrip(", ")
-        query_str += ");"
+    @staticmethod
+    def migrate_all() -> None:
+        """Create every registered table in one transaction"""
+        with session():
+            for model in SqlModel._registry:
+                model.migrate()
 
-        print(f"==CREATE MODEL {cls.__name__} QUERY==:\n{query_str}\n")
-        connection = engine.connect()
-        connection.execute(text(query_str))
-        connection.commit()
-        connection.close()
-        return super().__init_subclass__()
+    @staticmethod
+    def drop_all(models: list[type["SqlModel"]]) -> None:
+        """Drop the given tables in one transaction, recreated lazily on next use"""
+        with session():
+            for model in models:
+                model.drop()
 
     @classmethod
     def create(cls, fields: dict[str, Any]):
+        cls.migrate()
         table = cls.table_name
+        if HAS_RETURNING:
+            row = ORM.from_(table).create_returning(fields)
+            if row is None:
+                raise SmolORMException(f"Failed to create {cls.__name__}")
+            return row
+
         row_id = ORM.from_(table).create(fields)
         result = ORM.from_(cls.table_name).select().where(col("id") == row_id).run()
 
@@ -177,23 +221,45 @@ class SqlModel(ABC):
 
         return result[0]
 
+    @classmethod
+    def create_many(cls, rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        if not rows:
+            return []
+
+        cls.migrate()
+        table = cls.table_name
+        with session():
+            if HAS_RETURNING:
+                return ORM.from_(table).create_many_returning(rows)
+
+            # The first insert takes the write lock until commit, so every row
+            # from its id onward is ours
+            first_id = ORM.from_(table).create(rows[0])
+            for row in rows[1:]:
+                ORM.from_(table).create(row)
+            new_rows = ORM.from_(table).select().where(col("id") >= first_id)
+            return new_rows.order_by("id").run()
+
     @classmethod
     def update(cls, fields: dict[str, Any]):
+        cls.migrate()
         table = cls.table_name
         return ORM.from_(table).update(fields)
 
     @classmethod
     def delete(cls):
+        cls.migrate()
         table = cls.table_name
         return ORM.from_(table).delete()
 
     @classmethod
     def select(cls, *cols):
+        cls.migrate()
         return ORM.from_(cls.table_name).select(*cols)
 
     @classmethod
     def drop(cls):
-        connection = engine.connect()
         query_str = f"DROP table IF EXISTS {cls.table_name};"
-        connection.execute(text(query_str))
-        connection.close()
+        with connect() as connection:
+            connection.execute(text(query_str))
+        cls._migrated = False
@@ -1,4 +1,5 @@
 import pytest
+from smolorm.connection import session
 from smolorm.sqlmodel import IntField, SqlModel, TextField
 from smolorm.expressions import col
 
@@ -16,15 +17,19 @@ class Post(SqlModel):
     user_id = IntField(default_value=0)
 
 
-@pytest.fixture(autouse=True)
+@pytest.fixture(scope="module", autouse=True)
 def setup_tables():
-    User.drop()
-    Post.drop()
-    User.__init_subclass__()
-    Post.__init_subclass__()
+    SqlModel.drop_all([User, Post])
+    User.migrate()
+    Post.migrate()
     yield
-    User.drop()
-    Post.drop()
+    SqlModel.drop_all([User, Post])
+
+
+@pytest.fixture(autouse=True)
+def rollback_writes():
+    with session(rollback=True):
+        yield
 
 
 def test_user_post_relationship_simulation():
@@ -1,6 +1,7 @@
 from datetime import datetime
 import pytest
 import json
+from smolorm.connection import session
 from smolorm.expressions import col
 from smolorm.sqlmodel import (
     DatetimeField,
@@ -102,24 +103,23 @@ class UserModel(SqlModel):
     password = TextField(default_value="password")
 
 
-@pytest.fixture(autouse=True)
+MODELS = [UserModel, GameMetadataModel, GameBacklogEntryModel, GameBacklogModel]
+
+
+@pytest.fixture(scope="module", autouse=True)
 def setup_models():
-    for model in [
-        UserModel,
-        GameMetadataModel,
-        GameBacklogEntryModel,
-        GameBacklogModel,
-    ]:
-        model.drop()
-        model.__init_subclass__()
+    SqlModel.drop_all(MODELS)
+    for model in MODELS:
+        model.migrate()
     yield
-    for model in [
-        UserModel,
-        GameMetadataModel,
-        GameBacklogEntryModel,
-        GameBacklogModel,
-    ]:
-        model.drop()
+    SqlModel.drop_all(MODELS)
+
+
+@pytest.fixture(autouse=True)
+def rollback_writes():
+    # Tables outlive the test, its rows do not
+    with session(rollback=True):
+        yield
 
 
 def test_user_create_and_defaults():
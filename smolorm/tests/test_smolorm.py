@@ -1,4 +1,6 @@
 import pytest
+from sqlalchemy import inspect
+from smolorm.connection import engine, session
 from smolorm.sqlmodel import IntField, SqlModel, TextField
 from smolorm.expressions import col
 
@@ -12,8 +14,7 @@ class TestUser(SqlModel):
 
 @pytest.fixture(autouse=True)
 def clean_table():
-    TestUser.drop()
-    TestUser.__init_subclass__()  # recreate table
+    TestUser.drop()  # recreated on first use
     yield
     TestUser.drop()
 
@@ -160,3 +161,78 @@ def test_complex_clause_combination():
 
     assert r["username"] == "user55"
     assert last_r["username"] == "user51"
+
+
+def test_values_are_bound_not_inlined():
+    tricky = """it's a "quote" :colon"""
+    TestUser.create({"username": tricky, "password": "x", "age": 1})
+    TestUser.update({"password": "a'b"}).where(col("username") == tricky).run()
+
+    results = TestUser.select().where(col("password") == "a'b").run()
+    assert [r["username"] for r in results] == [tricky]
+    assert TestUser.select().where(col("username") == "' OR '1'='1").run() == []
+
+
+def test_create_many_returns_new_rows():
+    TestUser.create({"username": "first", "password": "x", "age": 1})
+    rows = TestUser.create_many(
+        [{"username": f"bulk{i}", "password": "y", "age": i} for i in range(3)]
+    )
+
+    assert [r["username"] for r in rows] == ["bulk0", "bulk1", "bulk2"]
+    assert [r["id"] for r in rows] == [2, 3, 4]
+    assert TestUser.create_many([]) == []
+    assert len(TestUser.select().run()) == 4
+
+
+@pytest.mark.parametrize("returning", [True, False])
+def test_create_many_returns_rows_across_chunks(monkeypatch, returning):
+    monkeypatch.setattr("smolorm.sqlmodel.HAS_RETURNING", returning)
+    rows = TestUser.create_many(
+        [{"username": f"bulk{i}", "password": "y", "age": i} for i in range(400)]
+    )
+
+    assert [r["age"] for r in rows] == list(range(400))
+    assert [r["id"] for r in rows] == list(range(1, 401))
+
+
+def test_tables_are_created_on_first_use():
+    class LazyModel(SqlModel):
+        table_name = "test_lazy"
+        name = TextField(default_value="")
+
+    try:
+        assert not inspect(engine).has_table("test_lazy")
+        assert LazyModel.select().run() == []
+        assert inspect(engine).has_table("test_lazy")
+    finally:
+        LazyModel.drop()
+        SqlModel._registry.remove(LazyModel)
+
+
+def test_rolled_back_first_use_creates_table_again():
+    class RollbackModel(SqlModel):
+        table_name = "test_rollback"
+        name = TextField(default_value="")
+
+    try:
+        with pytest.raises(RuntimeError):
+            with session():
+                TestUser.create({"username": "x", "password": "y", "age": 1})
+                RollbackModel.create({"name": "lost"})
+                raise RuntimeError
+
+        assert RollbackModel.select().run() == []
+        assert RollbackModel.create({"name": "kept"})["name"] == "kept"
+    finally:
+        RollbackModel.drop()
+        SqlModel._registry.remove(RollbackModel)
+
+
+def test_stream_yields_rows_lazily():
+    for i in range(3):
+        TestUser.create({"username": f"user{i}", "password": "x", "age": i})
+
+    rows = TestUser.select("username").order_by("age").stream()
+    assert next(rows) == {"username": "user0"}
+    assert [r["username"] for r in rows] == ["user1", "user2"]